@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Script to benchmark the GitHub client transports under concurrent fan-out
+
+Fires the same batch of API calls through every transport ("http1" keep-alive
+session, "http2" multiplexed httpx client) in both sync (thread pool) and
+async modes, and reports wall time, throughput and p50/p99 latency. The
+default endpoint is /rate_limit, which does not count against the rate limit.
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import github_client
+from github_client import TRANSPORTS, async_github_request, github_request
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def timed_sync(path, token):
+    started = time.perf_counter()
+    response = github_request("GET", path, token)
+    return time.perf_counter() - started, response.status_code
+
+def run_sync(path, token, total, concurrency):
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(lambda _: timed_sync(path, token), range(total)))
+
+async def run_async(path, token, total, concurrency):
+    client = github_client.async_client()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            started = time.perf_counter()
+            response = await async_github_request(client, "GET", path, token)
+            return time.perf_counter() - started, response.status_code
+
+    try:
+        return await asyncio.gather(*(one() for _ in range(total)))
+    finally:
+        if client is not None:
+            await client.aclose()
+
+def http2_available():
+    try:
+        import h2  # noqa: F401
+        import httpx  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GitHub client transports")
+    parser.add_argument('--path', default="/rate_limit", help="API path to request")
+    parser.add_argument('--requests', type=int, default=200, help="Requests per scenario")
+    parser.add_argument('--concurrency', type=int, default=32, help="Concurrent in-flight requests")
+    parser.add_argument('--transports', default=",".join(TRANSPORTS), help="Transports to compare")
+    parser.add_argument('--modes', default="sync,async", help="Modes to compare: sync,async")
+    args = parser.parse_args()
+
+    token = github_client.get_github_token()
+    if not token:
+        print("Please set your GitHub token as GITHUB_TOKEN environment variable")
+        return False
+
+    transports = [t.strip() for t in args.transports.split(",") if t.strip()]
+    if "http2" in transports and not http2_available():
+        print("⚠️  httpx/h2 not installed, skipping http2 (pip install 'httpx[http2]')")
+        transports.remove("http2")
+
+    rows = []
+    for transport in transports:
+        github_client.set_transport(transport)
+        for mode in [m.strip() for m in args.modes.split(",") if m.strip()]:
+            print(f"⏱️  {transport} / {mode}: {args.requests} requests, {args.concurrency} in flight")
+            # Warm up so connection setup is measured once per scenario, not per request
+            github_request("GET", args.path, token)
+            started = time.perf_counter()
+            if mode == "async":
+                results = asyncio.run(run_async(args.path, token, args.requests, args.concurrency))
+            else:
+                results = run_sync(args.path, token, args.requests, args.concurrency)
+            elapsed = time.perf_counter() - started
+            github_client.close_clients()
+
+            latencies = [latency for latency, _ in results]
+            errors = sum(1 for _, status in results if status >= 400)
+            rows.append((transport, mode, elapsed, len(results) / elapsed, percentile(latencies, 50) * 1000,
+                         percentile(latencies, 99) * 1000, errors))
+
+    print("\n| Transport | Mode | Wall (s) | Req/s | p50 (ms) | p99 (ms) | Errors |")
+    print("|-----------|------|----------|-------|----------|----------|--------|")
+    for transport, mode, elapsed, throughput, p50, p99, errors in rows:
+        print(f"| {transport} | {mode} | {elapsed:.2f} | {throughput:.1f} | {p50:.1f} | {p99:.1f} | {errors} |")
+    return all(row[-1] == 0 for row in rows)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
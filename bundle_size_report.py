@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Script to report per-asset bundle sizes (raw, gzip, brotli) for the Vite build output
+
+Compression runs in a process pool and results are cached by content hash, so
+only assets that actually changed are recompressed. The report is compared
+against a base snapshot and can be published as a pull request comment.
+The base comes from --base-snapshot (CI keeps the latest main build's
+snapshot there), falling back to a bundle-size.json committed on the base
+branch. Main builds refresh the cached snapshot with --write-snapshot PATH.
+"""
+
+import argparse
+import gzip
+import json
+import os
+import re
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from hash_cache import HashCache, file_digest
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+SNAPSHOT_FILE = "bundle-size.json"
+REPORT_MARKER = "bundle-size-report"
+
+# Vite appends an 8 character content hash: assets/index-B3xk9_Qa.js
+HASHED_NAME = re.compile(r'-[A-Za-z0-9_-]{8}(?=\.[A-Za-z0-9]+$)')
+
+def compress_sizes(path):
+    """Compute raw, gzip and brotli sizes for one asset (runs in a worker process)"""
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    sizes = {
+        "raw": len(data),
+        "gzip": len(gzip.compress(data, compresslevel=9, mtime=0)),
+        "brotli": None
+    }
+    if brotli is not None:
+        sizes["brotli"] = len(brotli.compress(data, quality=11))
+    return sizes
+
+def asset_key(relative_path):
+    """Strip the build hash so the same chunk can be compared across builds"""
+    return HASHED_NAME.sub('', relative_path.replace(os.sep, '/'))
+
+def collect_assets(dist_dir):
+    """Walk the build directory and return {asset_key: absolute_path}"""
+    assets = {}
+    for root, _, files in os.walk(dist_dir):
+        for name in files:
+            if name.endswith('.map'):
+                continue
+            path = os.path.join(root, name)
+            key = asset_key(os.path.relpath(path, dist_dir))
+            # Two chunks can share a name (e.g. index-*.js); keep them apart
+            if key in assets:
+                key = os.path.relpath(path, dist_dir).replace(os.sep, '/')
+            assets[key] = path
+    return assets
+
+def measure(dist_dir, workers=None):
+    """Measure every asset, compressing cache misses in parallel"""
+    cache = HashCache("bundle-size", version=2 if brotli else 1)
+    assets = collect_assets(dist_dir)
+    digests = {key: file_digest(path) for key, path in assets.items()}
+
+    misses = sorted({digests[key]: key for key in assets if cache.get(digests[key]) is None}.items())
+    if misses:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            paths = [assets[key] for _, key in misses]
+            for (digest, _), sizes in zip(misses, pool.map(compress_sizes, paths)):
+                cache.put(digest, sizes)
+
+    print(f"📦 {len(assets)} assets measured ({len(misses)} compressed, {len(assets) - len(misses)} cached)")
+    cache.prune(digests.values())
+    cache.save()
+    return {key: cache.get(digests[key]) for key in sorted(assets)}
+
+def load_base_snapshot(base_ref, path=None):
+    """Read the base snapshot from a file (e.g. restored from the CI cache) or the base branch"""
+    if path and os.path.exists(path):
+        with open(path) as f:
+            print(f"📏 Comparing against {path}")
+            return json.load(f).get("assets", {})
+    result = subprocess.run(['git', 'show', f'{base_ref}:{SNAPSHOT_FILE}'],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        print(f"⚠️  No base snapshot found ({path or 'no --base-snapshot'}, {base_ref}:{SNAPSHOT_FILE}), "
+              f"reporting absolute sizes only")
+        return {}
+    return json.loads(result.stdout).get("assets", {})
+
+def total(sizes, field):
+    return sum((entry or {}).get(field) or 0 for entry in sizes.values())
+
+def format_bytes(value):
+    if value is None:
+        return "-"
+    if abs(value) < 1024:
+        return f"{value} B"
+    return f"{value / 1024:.1f} kB"
+
+def format_delta(current, previous):
+    if previous is None:
+        return "🆕"
+    if current is None:
+        return "🗑️"
+    delta = current - previous
+    if delta == 0:
+        return "0"
+    sign = "+" if delta > 0 else "-"
+    return f"{sign}{format_bytes(abs(delta))}"
+
+def build_report(current, base):
+    """Render the markdown size table for changed assets plus totals"""
+    lines = [
+        "## 📦 Bundle Size Report",
+        "",
+        "| Asset | Raw | Gzip | Brotli | Δ Gzip |",
+        "|-------|-----|------|--------|--------|"
+    ]
+
+    changed = 0
+    for key in sorted(set(current) | set(base)):
+        now = current.get(key) or {}
+        before = base.get(key) or {}
+        if now.get("gzip") == before.get("gzip") and now.get("raw") == before.get("raw"):
+            continue
+        changed += 1
+        lines.append(f"| `{key}` | {format_bytes(now.get('raw'))} | {format_bytes(now.get('gzip'))} "
+                     f"| {format_bytes(now.get('brotli'))} | {format_delta(now.get('gzip'), before.get('gzip'))} |")
+
+    if not changed:
+        lines.append("| _no asset changes_ | | | | |")
+
+    lines.append(f"| **Total** | {format_bytes(total(current, 'raw'))} | {format_bytes(total(current, 'gzip'))} "
+                 f"| {format_bytes(total(current, 'brotli') or None)} "
+                 f"| {format_delta(total(current, 'gzip'), total(base, 'gzip') if base else None)} |")
+    return "\n".join(lines)
+
+def check_budget(current, base, budget_kb, max_growth_kb):
+    """Return a list of budget violations"""
+    violations = []
+    gzip_total = total(current, 'gzip')
+    if budget_kb is not None and gzip_total > budget_kb * 1024:
+        violations.append(f"total gzip size {format_bytes(gzip_total)} exceeds budget of {budget_kb} kB")
+    if max_growth_kb is not None and base:
+        growth = gzip_total - total(base, 'gzip')
+        if growth > max_growth_kb * 1024:
+            violations.append(f"gzip size grew by {format_bytes(growth)} (limit {max_growth_kb} kB)")
+    return violations
+
+def main():
+    parser = argparse.ArgumentParser(description="Report Vite bundle sizes against the base branch")
+    parser.add_argument('--dist', default='dist', help="Build output directory")
+    parser.add_argument('--base', default=os.getenv('GITHUB_BASE_REF') or 'main',
+                        help="Base branch holding the reference snapshot")
+    parser.add_argument('--budget-kb', type=float, help="Fail when total gzip size exceeds this")
+    parser.add_argument('--max-growth-kb', type=float, help="Fail when gzip size grows more than this")
+    parser.add_argument('--workers', type=int, help="Compression worker processes (default: CPU count)")
+    parser.add_argument('--base-snapshot', help="Snapshot file of the base branch build (preferred over git)")
+    parser.add_argument('--write-snapshot', nargs='?', const=SNAPSHOT_FILE, metavar='PATH',
+                        help=f"Write this build's snapshot (default path: {SNAPSHOT_FILE})")
+    parser.add_argument('--publish', action='store_true', help="Publish the report as a PR comment")
+    parser.add_argument('--pr', type=int, help="Pull request number (detected in GitHub Actions)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dist):
+        print(f"❌ Build directory '{args.dist}' not found. Run `npm run build` first")
+        return False
+
+    if brotli is None:
+        print("⚠️  brotli module not installed, brotli sizes will be skipped (pip install brotli)")
+
+    current = measure(args.dist, args.workers)
+
+    # Read the base before writing, the two paths may be the same file
+    ref = args.base if '/' in args.base else f"origin/{args.base}"
+    base = load_base_snapshot(ref, args.base_snapshot)
+
+    if args.write_snapshot:
+        os.makedirs(os.path.dirname(args.write_snapshot) or ".", exist_ok=True)
+        with open(args.write_snapshot, 'w') as f:
+            json.dump({"assets": current}, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"✅ Snapshot written to {args.write_snapshot}")
+    report = build_report(current, base)
+    violations = check_budget(current, base, args.budget_kb, args.max_growth_kb)
+    if violations:
+        report += "\n\n" + "\n".join(f"❌ {v}" for v in violations)
+    print(report)
+
+    if args.publish:
+        from github_client import current_pr_number, update_pr_comment
+        pr_number = args.pr or current_pr_number()
+        if pr_number is None:
+            print("⚠️  Could not determine the pull request number, skipping publish")
+        else:
+            update_pr_comment(pr_number, REPORT_MARKER, report)
+
+    return not violations
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Script to check the src/locales translations for consistency and split them per namespace
+
+Every locale is flattened into dotted keys with their {{placeholders}} and
+compared against the reference locale (en): missing keys, extra keys and
+placeholder mismatches are reported, optionally as a sticky PR comment
+that later runs edit in place. Flattened indexes are cached by file hash so
+unchanged locales are not re-read.
+
+With --split, each top-level namespace (common, staking, wallet, ...) is
+written to <out>/<lng>/<ns>.json, the layout i18next backends load lazily
+from /locales/{{lng}}/{{ns}}.json. Files whose content is unchanged are left
+untouched.
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+
+from hash_cache import HashCache, file_digest
+
+LOCALES_DIR = os.path.join("src", "locales")
+REFERENCE_LOCALE = "en"
+REPORT_MARKER = "locale-consistency-report"
+CACHE_VERSION = 1
+
+PLACEHOLDER = re.compile(r'\{\{\s*-?\s*([\w.]+)[^}]*\}\}')
+NESTING = re.compile(r'\$t\(([^,)]+)')
+PLURAL_SUFFIX = re.compile(r'_(zero|one|two|few|many|other)$')
+
+def flatten(tree, prefix=""):
+    """Flatten nested translations into {dotted.key: string}"""
+    flat = {}
+    for key, value in tree.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, f"{path}."))
+        else:
+            flat[path] = value
+    return flat
+
+def index_locale(path):
+    """Build {key: {"placeholders": [...], "empty": bool}} for one locale file"""
+    with open(path, encoding='utf-8') as f:
+        tree = json.load(f)
+    index = {}
+    for key, value in flatten(tree).items():
+        text = value if isinstance(value, str) else json.dumps(value)
+        index[key] = {
+            "placeholders": sorted(set(PLACEHOLDER.findall(text)) | {f"$t({m.strip()})" for m in NESTING.findall(text)}),
+            "empty": not text.strip()
+        }
+    return index
+
+def load_indexes(locales_dir):
+    """Index every locale, reusing cached indexes for unchanged files"""
+    cache = HashCache("locale-index", version=CACHE_VERSION)
+    indexes = {}
+    digests = []
+    reindexed = 0
+    for name in sorted(os.listdir(locales_dir)):
+        if not name.endswith('.json'):
+            continue
+        path = os.path.join(locales_dir, name)
+        digest = file_digest(path)
+        digests.append(digest)
+        index = cache.get(digest)
+        if index is None:
+            index = index_locale(path)
+            cache.put(digest, index)
+            reindexed += 1
+        indexes[name[:-5]] = index
+    cache.prune(digests)
+    cache.save()
+    print(f"🌐 {len(indexes)} locales indexed ({reindexed} changed)")
+    return indexes
+
+def base_key(key):
+    """Collapse i18next plural variants (key_one, key_other) to their base key"""
+    return PLURAL_SUFFIX.sub('', key)
+
+def compare(reference, locale):
+    """Compare one locale index against the reference index"""
+    reference_keys = {base_key(k) for k in reference}
+    locale_keys = {base_key(k) for k in locale}
+
+    placeholder_mismatches = []
+    for key in sorted(set(reference) & set(locale)):
+        expected = reference[key]["placeholders"]
+        actual = locale[key]["placeholders"]
+        if expected != actual:
+            placeholder_mismatches.append((key, expected, actual))
+
+    return {
+        "missing": sorted(reference_keys - locale_keys),
+        "extra": sorted(locale_keys - reference_keys),
+        "empty": sorted(k for k, v in locale.items() if v["empty"]),
+        "placeholders": placeholder_mismatches
+    }
+
+def build_report(results, limit):
+    lines = ["## 🌐 Locale Consistency Report", ""]
+
+    if not any(any(r.values()) for r in results.values()):
+        lines.append(f"✅ All locales match `{REFERENCE_LOCALE}`")
+        return "\n".join(lines)
+
+    lines.append("| Locale | Missing | Extra | Empty | Placeholder mismatches |")
+    lines.append("|--------|---------|-------|-------|------------------------|")
+    for locale, r in results.items():
+        lines.append(f"| `{locale}` | {len(r['missing'])} | {len(r['extra'])} | {len(r['empty'])} | {len(r['placeholders'])} |")
+    lines.append("")
+
+    for locale, r in results.items():
+        if not any(r.values()):
+            continue
+        lines.append(f"### `{locale}`")
+        lines.append("")
+        details = [f"- ❌ missing `{k}`" for k in r["missing"]]
+        details += [f"- ⚠️ placeholders in `{k}`: expected {', '.join(e) or 'none'}, found {', '.join(a) or 'none'}"
+                    for k, e, a in r["placeholders"]]
+        details += [f"- ➕ extra `{k}`" for k in r["extra"]]
+        details += [f"- ⚪ empty `{k}`" for k in r["empty"]]
+        lines.extend(details[:limit])
+        if len(details) > limit:
+            lines.append(f"- … and {len(details) - limit} more")
+        lines.append("")
+
+    return "\n".join(lines).rstrip()
+
+def write_if_changed(path, content):
+    try:
+        with open(path, encoding='utf-8') as f:
+            if f.read() == content:
+                return False
+    except OSError:
+        pass
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return True
+
+def split_namespaces(locales_dir, out_dir):
+    """Write one JSON bundle per locale and top-level namespace"""
+    written = total = 0
+    for name in sorted(os.listdir(locales_dir)):
+        if not name.endswith('.json'):
+            continue
+        with open(os.path.join(locales_dir, name), encoding='utf-8') as f:
+            tree = json.load(f)
+        for namespace, strings in tree.items():
+            total += 1
+            content = json.dumps(strings, ensure_ascii=False, separators=(',', ':'))
+            if write_if_changed(os.path.join(out_dir, name[:-5], f"{namespace}.json"), content):
+                written += 1
+    print(f"✂️  {total} namespace bundles in {out_dir} ({written} updated)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Check locale consistency and split namespace bundles")
+    parser.add_argument('--locales', default=LOCALES_DIR, help="Directory holding <lng>.json files")
+    parser.add_argument('--reference', default=REFERENCE_LOCALE, help="Locale other locales are compared to")
+    parser.add_argument('--split', metavar='OUT_DIR', nargs='?', const=os.path.join("public", "locales"),
+                        help="Write per-namespace bundles (default: public/locales)")
+    parser.add_argument('--limit', type=int, default=25, help="Maximum findings listed per locale")
+    parser.add_argument('--strict', action='store_true', help="Exit non-zero on missing keys or placeholder mismatches")
+    parser.add_argument('--publish', action='store_true', help="Publish the report as a PR comment")
+    parser.add_argument('--pr', type=int, help="Pull request number (detected in GitHub Actions)")
+    args = parser.parse_args()
+
+    indexes = load_indexes(args.locales)
+    if args.reference not in indexes:
+        print(f"❌ Reference locale '{args.reference}' not found in {args.locales}")
+        return False
+
+    reference = indexes[args.reference]
+    results = {locale: compare(reference, index) for locale, index in indexes.items() if locale != args.reference}
+    report = build_report(results, args.limit)
+    print(report)
+
+    if args.split:
+        split_namespaces(args.locales, args.split)
+
+    if args.publish:
+        from github_client import current_pr_number, update_pr_comment
+        pr_number = args.pr or current_pr_number()
+        if pr_number is None:
+            print("⚠️  Could not determine the pull request number, skipping publish")
+        else:
+            update_pr_comment(pr_number, REPORT_MARKER, report)
+
+    broken = any(r["missing"] or r["placeholders"] for r in results.values())
+    return not (args.strict and broken)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
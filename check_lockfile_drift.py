@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Script to detect drift between package-lock.json and pnpm-lock.yaml
+
+Both lockfiles are scanned line by line (no full JSON/YAML document is built)
+into a normalized {package: [versions]} index plus the root specifiers. Parsed
+indexes are cached by content hash, and the base branch copies are keyed by
+their git blob id, so repeat runs only parse files that actually changed.
+With --publish the report is kept in one sticky PR comment, edited in place
+on later runs.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+
+from hash_cache import HashCache, file_digest
+
+NPM_LOCK = "package-lock.json"
+PNPM_LOCK = "pnpm-lock.yaml"
+REPORT_MARKER = "lockfile-drift-report"
+CACHE_VERSION = 1
+
+NPM_ENTRY = re.compile(r'^    "(.*)": \{$')
+NPM_FIELD = re.compile(r'^      "(version|name)": "(.*)",?$')
+NPM_ROOT_SECTION = re.compile(r'^      "(dependencies|devDependencies)": \{$')
+NPM_ROOT_DEP = re.compile(r'^        "(.*)": "(.*)",?$')
+
+PNPM_SECTION = re.compile(r'^(\w+):')
+PNPM_PACKAGE = re.compile(r"^  '?/?([^'\s]+?)'?:")
+PNPM_IMPORTER_SECTION = re.compile(r'^    (dependencies|devDependencies):$')
+PNPM_IMPORTER_DEP = re.compile(r"^      '?([^'\s]+?)'?:$")
+PNPM_SPECIFIER = re.compile(r"^        specifier: '?([^']*?)'?$")
+
+def split_spec(spec):
+    """Split 'name@version' (handling @scoped names) into (name, version)"""
+    at = spec.rfind('@')
+    if at <= 0:
+        return spec, None
+    return spec[:at], spec[at + 1:]
+
+def empty_index():
+    return {"packages": {}, "root": {}}
+
+def add_version(index, name, version):
+    versions = index["packages"].setdefault(name, [])
+    if version not in versions:
+        versions.append(version)
+
+def parse_npm_lock(lines):
+    """Index a lockfileVersion 2/3 package-lock.json from its pretty-printed lines"""
+    index = empty_index()
+    entry = None
+    name = version = None
+    root_section = None
+
+    for line in lines:
+        line = line.rstrip('\n')
+        match = NPM_ENTRY.match(line)
+        if match:
+            if entry and version:
+                add_version(index, name, version)
+            entry = match.group(1)
+            name = entry.rsplit('node_modules/', 1)[-1]
+            version = None
+            root_section = None
+            continue
+
+        if entry is None:
+            continue
+
+        if entry == "":
+            section = NPM_ROOT_SECTION.match(line)
+            if section:
+                root_section = section.group(1)
+                continue
+            if root_section:
+                dep = NPM_ROOT_DEP.match(line)
+                if dep:
+                    index["root"][dep.group(1)] = dep.group(2)
+                    continue
+                if line.strip().startswith('}'):
+                    root_section = None
+            continue
+
+        field = NPM_FIELD.match(line)
+        if field:
+            if field.group(1) == "version":
+                version = field.group(2)
+            else:
+                name = field.group(2)
+
+    if entry and version:
+        add_version(index, name, version)
+    return index
+
+def parse_pnpm_lock(lines):
+    """Index a pnpm-lock.yaml (v6 or v9) from its packages and importers sections"""
+    index = empty_index()
+    section = None
+    importer = None
+    importer_section = None
+    dep = None
+
+    for line in lines:
+        line = line.rstrip('\n')
+        top = PNPM_SECTION.match(line)
+        if top:
+            section = top.group(1)
+            continue
+
+        if section == "packages":
+            match = PNPM_PACKAGE.match(line)
+            if match:
+                spec = match.group(1)
+                # pnpm v6 keys look like /name@version(peers) or /name/version
+                spec = spec.split('(', 1)[0]
+                name, version = split_spec(spec)
+                if version is None and '/' in spec.lstrip('@'):
+                    name, version = spec.rsplit('/', 1)
+                if version:
+                    add_version(index, name, version)
+
+        elif section == "importers":
+            if line.startswith('  ') and not line.startswith('   '):
+                importer = line.strip().rstrip(':')
+                continue
+            if importer != '.':
+                continue
+            match = PNPM_IMPORTER_SECTION.match(line)
+            if match:
+                importer_section = match.group(1)
+                continue
+            if importer_section:
+                match = PNPM_IMPORTER_DEP.match(line)
+                if match:
+                    dep = match.group(1)
+                    continue
+                match = PNPM_SPECIFIER.match(line)
+                if match and dep:
+                    index["root"][dep] = match.group(1)
+
+    return index
+
+PARSERS = {NPM_LOCK: parse_npm_lock, PNPM_LOCK: parse_pnpm_lock}
+
+def load_index(cache, path, live):
+    """Parse a lockfile from the working tree, reusing the cached index when unchanged
+
+    The cache key is added to live, the set of entries kept when the cache is pruned.
+    """
+    if not os.path.exists(path):
+        return None
+    digest = file_digest(path)
+    live.add(digest)
+    index = cache.get(digest)
+    if index is None:
+        with open(path, encoding='utf-8') as f:
+            index = PARSERS[os.path.basename(path)](f)
+        cache.put(digest, index)
+    return index
+
+def load_base_index(cache, base_ref, path, live):
+    """Parse a lockfile as it exists on the base branch, keyed by its blob id (added to live)"""
+    result = subprocess.run(['git', 'rev-parse', f'{base_ref}:{path}'], capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    key = f"git:{result.stdout.strip()}"
+    live.add(key)
+    index = cache.get(key)
+    if index is None:
+        show = subprocess.run(['git', 'show', f'{base_ref}:{path}'], capture_output=True, text=True)
+        if show.returncode != 0:
+            return None
+        index = PARSERS[os.path.basename(path)](show.stdout.splitlines())
+        cache.put(key, index)
+    return index
+
+def duplicates(index):
+    """Return {name: versions} for packages resolved at more than one version"""
+    if index is None:
+        return {}
+    return {name: sorted(versions) for name, versions in index["packages"].items() if len(versions) > 1}
+
+def read_manifest_specifiers():
+    with open("package.json") as f:
+        manifest = json.load(f)
+    specifiers = {}
+    specifiers.update(manifest.get("devDependencies", {}))
+    specifiers.update(manifest.get("dependencies", {}))
+    return specifiers
+
+def compare(npm, pnpm, manifest):
+    """Compute drift between the two lockfile indexes and package.json"""
+    npm_pairs = {(n, v) for n, vs in npm["packages"].items() for v in vs}
+    pnpm_pairs = {(n, v) for n, vs in pnpm["packages"].items() for v in vs}
+
+    stale_roots = {}
+    for lockfile, index in ((NPM_LOCK, npm), (PNPM_LOCK, pnpm)):
+        for name in sorted(set(manifest) | set(index["root"])):
+            if manifest.get(name) != index["root"].get(name):
+                stale_roots.setdefault(lockfile, []).append(
+                    (name, manifest.get(name), index["root"].get(name)))
+
+    return {
+        "only_npm": sorted(npm_pairs - pnpm_pairs),
+        "only_pnpm": sorted(pnpm_pairs - npm_pairs),
+        "stale_roots": stale_roots
+    }
+
+def format_pairs(pairs, limit):
+    lines = [f"- `{name}@{version}`" for name, version in pairs[:limit]]
+    if len(pairs) > limit:
+        lines.append(f"- … and {len(pairs) - limit} more")
+    return lines
+
+def build_report(drift, new_duplicates, limit):
+    lines = ["## 🔒 Lockfile Drift Report", ""]
+
+    if not any([drift["only_npm"], drift["only_pnpm"], drift["stale_roots"], new_duplicates]):
+        lines.append(f"✅ `{NPM_LOCK}` and `{PNPM_LOCK}` are in sync with `package.json`")
+        return "\n".join(lines)
+
+    for lockfile, entries in drift["stale_roots"].items():
+        lines.append(f"### ⚠️ `{lockfile}` root dependencies out of date ({len(entries)})")
+        lines.append("")
+        lines.append("| Package | package.json | Lockfile |")
+        lines.append("|---------|--------------|----------|")
+        for name, wanted, locked in entries[:limit]:
+            lines.append(f"| `{name}` | {wanted or '-'} | {locked or '-'} |")
+        lines.append("")
+
+    for title, pairs in ((f"Only in `{NPM_LOCK}`", drift["only_npm"]),
+                         (f"Only in `{PNPM_LOCK}`", drift["only_pnpm"])):
+        if pairs:
+            lines.append(f"### {title} ({len(pairs)})")
+            lines.append("")
+            lines.extend(format_pairs(pairs, limit))
+            lines.append("")
+
+    if new_duplicates:
+        lines.append(f"### 🧬 New duplicate versions ({len(new_duplicates)})")
+        lines.append("")
+        for lockfile, name, versions in new_duplicates[:limit]:
+            lines.append(f"- `{name}`: {', '.join(versions)} ({lockfile})")
+        lines.append("")
+
+    return "\n".join(lines).rstrip()
+
+def main():
+    parser = argparse.ArgumentParser(description="Check package-lock.json and pnpm-lock.yaml for drift")
+    parser.add_argument('--base', default=os.getenv('GITHUB_BASE_REF') or 'main',
+                        help="Base branch used to detect newly introduced duplicates")
+    parser.add_argument('--limit', type=int, default=50, help="Maximum entries listed per section")
+    parser.add_argument('--fail-on-drift', action='store_true', help="Exit non-zero when drift is found")
+    parser.add_argument('--publish', action='store_true', help="Publish the report as a PR comment")
+    parser.add_argument('--pr', type=int, help="Pull request number (detected in GitHub Actions)")
+    args = parser.parse_args()
+
+    cache = HashCache("lockfile-index", version=CACHE_VERSION)
+    live = set()
+    npm = load_index(cache, NPM_LOCK, live)
+    pnpm = load_index(cache, PNPM_LOCK, live)
+    if npm is None or pnpm is None:
+        print(f"❌ Both {NPM_LOCK} and {PNPM_LOCK} are required")
+        return False
+
+    ref = args.base if '/' in args.base else f"origin/{args.base}"
+    new_duplicates = []
+    for lockfile, index in ((NPM_LOCK, npm), (PNPM_LOCK, pnpm)):
+        base_index = load_base_index(cache, ref, lockfile, live)
+        if base_index is None:
+            print(f"⚠️  {lockfile} not found on {ref}, skipping duplicate comparison")
+            continue
+        base_duplicates = duplicates(base_index)
+        for name, versions in sorted(duplicates(index).items()):
+            if len(versions) > len(base_duplicates.get(name, [None])):
+                new_duplicates.append((lockfile, name, versions))
+    # Keep only the indexes of the lockfiles and base blobs used by this run
+    cache.prune(live)
+    cache.save()
+
+    drift = compare(npm, pnpm, read_manifest_specifiers())
+    report = build_report(drift, new_duplicates, args.limit)
+    print(report)
+
+    if args.publish:
+        from github_client import current_pr_number, update_pr_comment
+        pr_number = args.pr or current_pr_number()
+        if pr_number is None:
+            print("⚠️  Could not determine the pull request number, skipping publish")
+        else:
+            update_pr_comment(pr_number, REPORT_MARKER, report)
+
+    has_drift = bool(drift["only_npm"] or drift["only_pnpm"] or drift["stale_roots"])
+    return not (args.fail_on_drift and has_drift)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Script to clean up merged and abandoned branches and superseded pull requests
+
+Branch state comes from a local scan of the origin remote-tracking refs (run
+`git fetch --prune` first) plus the cached PR index, so planning needs no
+per-branch API calls. The default is a dry run that prints the plan. Pass
+--apply to close PRs and delete remote branches in a bounded thread pool.
+
+A branch is deleted when it is fully merged into the base branch, when its
+PR was merged or closed at the same commit, or when it has no open PR and
+no commits for --stale-days. PRs are matched to branches by name and head
+repository, so PRs from forks are never tied to origin branches. An open PR
+is closed when its branch is already merged, or when a newer PR referencing
+the same issue (#N) was merged. Branches that are the base of a PR that
+stays open are never deleted, since GitHub would close the stacked PR along
+with them.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from github_client import REPO, github_request, load_pr_index
+
+REMOTE = "origin"
+PROTECTED = {"main", "master", "develop", "gh-pages", "HEAD"}
+ISSUE_REF = re.compile(r'#(\d+)')
+
+def scan_refs(base):
+    """Return ({branch: (sha, commit_time)}, merged_branches) from local remote-tracking refs"""
+    fmt = '%(refname:lstrip=3)%09%(objectname)%09%(committerdate:unix)'
+    prefix = f'refs/remotes/{REMOTE}'
+    refs = subprocess.run(['git', 'for-each-ref', f'--format={fmt}', prefix],
+                          capture_output=True, text=True, check=True).stdout
+    merged = subprocess.run(['git', 'for-each-ref', '--format=%(refname:lstrip=3)',
+                             f'--merged={REMOTE}/{base}', prefix],
+                            capture_output=True, text=True, check=True).stdout
+
+    branches = {}
+    for line in refs.splitlines():
+        name, sha, timestamp = line.split('\t')
+        branches[name] = (sha, int(timestamp or 0))
+    return branches, set(merged.split())
+
+def parse_time(value):
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%SZ")
+
+def plan_cleanup(branches, merged, prs, base, stale_days, protected):
+    """Compute (branches_to_delete, prs_to_close) with a reason for each"""
+    now = time.time()
+    by_head = {}
+    for pr in prs.values():
+        # Only PRs from this repository's own branches; a fork's same-named branch is unrelated
+        if (pr.get("head_repo") or "").lower() == REPO.lower():
+            by_head.setdefault(pr["head_ref"], []).append(pr)
+
+    delete = {}
+    close = {}
+
+    # Open PRs superseded by a newer merged PR for the same issue
+    merged_by_issue = {}
+    for pr in prs.values():
+        if pr["merged_at"]:
+            for issue in ISSUE_REF.findall(pr["title"]):
+                merged_by_issue.setdefault(issue, []).append(pr)
+    for pr in prs.values():
+        if pr["state"] != "open":
+            continue
+        for issue in ISSUE_REF.findall(pr["title"]):
+            newer = [m for m in merged_by_issue.get(issue, [])
+                     if m["number"] != pr["number"] and parse_time(m["created_at"]) > parse_time(pr["created_at"])]
+            if newer:
+                close[pr["number"]] = (pr, f"superseded by merged #{newer[0]['number']} (issue #{issue})")
+                break
+
+    # Deleting a branch closes every open PR based on it
+    stack_bases = {pr["base_ref"] for pr in prs.values() if pr["state"] == "open" and pr["number"] not in close}
+
+    for name, (sha, committed) in sorted(branches.items()):
+        if name in protected or name == base or name in stack_bases:
+            continue
+        branch_prs = by_head.get(name, [])
+        open_prs = [pr for pr in branch_prs if pr["state"] == "open" and pr["number"] not in close]
+
+        if name in merged:
+            delete[name] = f"fully merged into {base}"
+            for pr in open_prs:
+                close[pr["number"]] = (pr, f"branch already merged into {base}")
+            continue
+        if open_prs:
+            continue
+
+        finished = [pr for pr in branch_prs if pr["head_sha"] == sha]
+        if any(pr["merged_at"] for pr in finished):
+            delete[name] = f"PR #{next(pr for pr in finished if pr['merged_at'])['number']} merged"
+        elif any(pr["number"] in close for pr in finished):
+            delete[name] = f"PR #{next(pr for pr in finished if pr['number'] in close)['number']} superseded"
+        elif finished:
+            delete[name] = f"PR #{finished[0]['number']} closed without merge"
+        elif now - committed > stale_days * 86400:
+            delete[name] = f"no open PR, last commit {int((now - committed) // 86400)} days ago"
+
+    return delete, close
+
+def close_pr(pr, reason):
+    response = github_request("POST", f"/repos/{REPO}/issues/{pr['number']}/comments",
+                              json={"body": f"Closing automatically: {reason}."})
+    if response.status_code != 201:
+        return False, f"comment failed ({response.status_code})"
+    response = github_request("PATCH", f"/repos/{REPO}/pulls/{pr['number']}", json={"state": "closed"})
+    return response.status_code == 200, str(response.status_code)
+
+def delete_branch(name):
+    response = github_request("DELETE", f"/repos/{REPO}/git/refs/heads/{name}")
+    # 422: already deleted on the remote
+    return response.status_code in (204, 422), str(response.status_code)
+
+def execute(delete, close, concurrency):
+    """Close PRs first, then delete branches, each in a bounded thread pool"""
+    failures = 0
+    phases = (
+        ("Closed PR", [(close_pr, (pr, reason), f"#{number}") for number, (pr, reason) in close.items()]),
+        ("Deleted branch", [(delete_branch, (name,), name) for name in delete])
+    )
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for label, tasks in phases:
+            jobs = {pool.submit(func, *func_args): name for func, func_args, name in tasks}
+            for future in as_completed(jobs):
+                ok, detail = future.result()
+                if ok:
+                    print(f"✅ {label} {jobs[future]}")
+                else:
+                    failures += 1
+                    print(f"❌ {label} {jobs[future]} failed: {detail}")
+    return failures == 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Clean up merged/abandoned branches and superseded PRs")
+    parser.add_argument('--base', default="main", help="Branch that work is merged into")
+    parser.add_argument('--stale-days', type=int, default=90, help="Age after which a branch without an open PR is abandoned")
+    parser.add_argument('--keep', action='append', default=[], help="Branch to never delete (repeatable)")
+    parser.add_argument('--concurrency', type=int, default=4, help="Maximum concurrent API calls")
+    parser.add_argument('--offline', action='store_true', help="Plan from the cached PR index without refreshing it")
+    parser.add_argument('--apply', action='store_true', help="Execute the plan (default: dry run)")
+    args = parser.parse_args()
+
+    branches, merged = scan_refs(args.base)
+    prs = load_pr_index(refresh=not args.offline)
+    print(f"🔎 {len(branches)} remote branches, {len(merged)} merged into {args.base}, {len(prs)} PRs indexed")
+
+    delete, close = plan_cleanup(branches, merged, prs, args.base, args.stale_days, PROTECTED | set(args.keep))
+
+    print(f"\n📋 Cleanup plan{'' if args.apply else ' (dry run)'}:")
+    for number, (pr, reason) in sorted(close.items()):
+        print(f"  🔒 close #{number} {pr['title']} — {reason}")
+    for name, reason in sorted(delete.items()):
+        print(f"  🗑️  delete {name} — {reason}")
+    if not delete and not close:
+        print("  ✨ Nothing to clean up")
+        return True
+
+    if not args.apply:
+        print("\nRe-run with --apply to execute")
+        return True
+
+    if not execute(delete, close, args.concurrency):
+        return False
+    subprocess.run(['git', 'fetch', '--prune', REMOTE], capture_output=True)
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
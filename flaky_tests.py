@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Script to build a flaky-test index from jest and Cypress result history
+
+Ingests jest JSON results (`jest --json --outputFile=...`) and JUnit XML
+(Cypress `--reporter junit`) into an indexed SQLite history store, one row
+per test per run. A test is flaky on a commit when it both passed and failed
+there (across reruns) or only passed after a retry. From the history the
+script reports per-test flake rates and duration trends, and annotates the
+PR with the run's failures marked as known flakes or new, plus the slowest
+tests. Each suite publishes into its own sticky PR comment, so parallel
+jobs never overwrite each other.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import statistics
+import subprocess
+import sys
+import time
+import xml.etree.ElementTree as ET
+
+from hash_cache import CACHE_DIR
+
+HISTORY_DB = os.path.join(CACHE_DIR, "test-history.sqlite")
+REPORT_MARKER = "test-history-report"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id TEXT PRIMARY KEY,
+    sha TEXT NOT NULL,
+    ref TEXT,
+    suite TEXT NOT NULL,
+    started INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY,
+    suite TEXT NOT NULL,
+    file TEXT NOT NULL,
+    name TEXT NOT NULL,
+    UNIQUE (suite, file, name)
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    test_id INTEGER NOT NULL REFERENCES tests(id),
+    status TEXT NOT NULL,
+    duration_ms INTEGER,
+    retries INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (run_id, test_id)
+);
+CREATE INDEX IF NOT EXISTS results_by_test ON results (test_id);
+CREATE INDEX IF NOT EXISTS runs_by_suite ON runs (suite, started);
+"""
+
+def open_store(path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA foreign_keys = ON")
+    db.executescript(SCHEMA)
+    return db
+
+def parse_jest(path):
+    """Yield (file, name, status, duration_ms, retries) from a jest --json report"""
+    with open(path) as f:
+        report = json.load(f)
+    root = os.getcwd()
+    for suite in report.get("testResults", []):
+        file = os.path.relpath(suite["name"], root) if os.path.isabs(suite["name"]) else suite["name"]
+        for test in suite.get("assertionResults", []):
+            status = {"pending": "skipped", "todo": "skipped", "disabled": "skipped"}.get(test["status"], test["status"])
+            # jest-circus reports invocations > 1 when retryTimes retried the test
+            retries = max((test.get("invocations") or 1) - 1, 0)
+            yield file, test["fullName"], status, test.get("duration"), retries
+
+def parse_junit(path):
+    """Yield (file, name, status, duration_ms, retries) from a JUnit XML report"""
+    files = []
+    for event, element in ET.iterparse(path, events=("start", "end")):
+        if element.tag == "testsuite":
+            if event == "start":
+                files.append(element.get("file") or (files[-1] if files else ""))
+            else:
+                files.pop()
+                element.clear()
+        elif element.tag == "testcase" and event == "end":
+            if element.find("skipped") is not None:
+                status = "skipped"
+            elif element.find("failure") is not None or element.find("error") is not None:
+                status = "failed"
+            else:
+                status = "passed"
+            name = element.get("name", "")
+            classname = element.get("classname", "")
+            if classname and classname not in name:
+                name = f"{classname} {name}"
+            duration = element.get("time")
+            yield (files[-1] if files else "", name, status,
+                   round(float(duration) * 1000) if duration else None, 0)
+            element.clear()
+
+def parse_results(path):
+    return parse_junit(path) if path.endswith(".xml") else parse_jest(path)
+
+def ingest(db, paths, run_id, sha, ref, suite):
+    """Replace the results of run_id with the tests found in paths"""
+    with db:
+        db.execute("DELETE FROM runs WHERE id = ?", (run_id,))
+        db.execute("INSERT INTO runs (id, sha, ref, suite, started) VALUES (?, ?, ?, ?, ?)",
+                   (run_id, sha, ref, suite, int(time.time())))
+        count = 0
+        for path in paths:
+            for file, name, status, duration, retries in parse_results(path):
+                db.execute("INSERT OR IGNORE INTO tests (suite, file, name) VALUES (?, ?, ?)", (suite, file, name))
+                test_id = db.execute("SELECT id FROM tests WHERE suite = ? AND file = ? AND name = ?",
+                                     (suite, file, name)).fetchone()[0]
+                # A test reported twice in one run (e.g. split reports) counts as a rerun
+                db.execute("""INSERT INTO results (run_id, test_id, status, duration_ms, retries)
+                              VALUES (?, ?, ?, ?, ?)
+                              ON CONFLICT (run_id, test_id) DO UPDATE SET
+                                  retries = retries + 1,
+                                  status = CASE WHEN status = excluded.status THEN status ELSE 'flaky' END""",
+                           (run_id, test_id, status, duration, retries))
+                count += 1
+    return count
+
+def prune(db, suite, keep):
+    """Keep only the most recent `keep` runs of a suite"""
+    with db:
+        db.execute("""DELETE FROM runs WHERE suite = ? AND id NOT IN (
+                          SELECT id FROM runs WHERE suite = ? ORDER BY started DESC LIMIT ?)""",
+                   (suite, suite, keep))
+        db.execute("DELETE FROM tests WHERE id NOT IN (SELECT test_id FROM results)")
+
+def flake_rates(db, suite, window):
+    """Return {test_id: (flaky_commits, commits)} over the last `window` runs"""
+    rows = db.execute("""
+        SELECT r.test_id, u.sha,
+               SUM(r.status = 'passed'), SUM(r.status = 'failed'),
+               SUM(r.status = 'flaky' OR (r.status = 'passed' AND r.retries > 0))
+        FROM results r
+        JOIN (SELECT id, sha FROM runs WHERE suite = ? ORDER BY started DESC LIMIT ?) u ON u.id = r.run_id
+        WHERE r.status != 'skipped'
+        GROUP BY r.test_id, u.sha""", (suite, window))
+    rates = {}
+    for test_id, _, passed, failed, retried in rows:
+        flaky, total = rates.get(test_id, (0, 0))
+        rates[test_id] = (flaky + int(bool(retried or (passed and failed))), total + 1)
+    return rates
+
+def duration_trend(db, test_id, recent=5, window=30):
+    """Return (recent median, earlier median) of passing durations, newest first"""
+    durations = [row[0] for row in db.execute("""
+        SELECT r.duration_ms FROM results r JOIN runs u ON u.id = r.run_id
+        WHERE r.test_id = ? AND r.status = 'passed' AND r.duration_ms IS NOT NULL
+        ORDER BY u.started DESC LIMIT ?""", (test_id, window))]
+    if len(durations) <= recent:
+        return (statistics.median(durations) if durations else None), None
+    return statistics.median(durations[:recent]), statistics.median(durations[recent:])
+
+def format_trend(now, before):
+    if now is None or before is None or before == 0:
+        return "-"
+    change = (now - before) / before * 100
+    if abs(change) < 10:
+        return "→"
+    return f"{'↑' if change > 0 else '↓'} {change:+.0f}%"
+
+def build_report(db, run_id, suite, window, threshold, slowest):
+    rates = flake_rates(db, suite, window)
+    current = db.execute("""
+        SELECT t.id, t.file, t.name, r.status, r.duration_ms, r.retries
+        FROM results r JOIN tests t ON t.id = r.test_id WHERE r.run_id = ?""", (run_id,)).fetchall()
+
+    def rate(test_id):
+        flaky, total = rates.get(test_id, (0, 0))
+        return flaky / total if total else 0.0
+
+    lines = [f"## 🧪 Test History ({suite})", ""]
+    failures = [row for row in current if row[3] in ("failed", "flaky") or (row[3] == "passed" and row[5])]
+    if failures:
+        lines += ["| Test | Result | Flake rate | Verdict |", "|------|--------|------------|---------|"]
+        for test_id, file, name, status, _, retries in sorted(failures, key=lambda row: -rate(row[0])):
+            result = "passed after retry" if status == "passed" else status
+            known = rate(test_id) >= threshold
+            verdict = "⚠️ known flaky" if known else ("❌ new failure" if status == "failed" else "🔁 retried")
+            lines.append(f"| `{file}` › {name} | {result} | {rate(test_id):.0%} | {verdict} |")
+    else:
+        lines.append("✅ No failures or retries in this run")
+
+    timed = sorted((row for row in current if row[4] is not None), key=lambda row: -row[4])[:slowest]
+    if timed:
+        lines += ["", "<details><summary>Slowest tests</summary>", "",
+                  "| Test | Duration | Trend |", "|------|----------|-------|"]
+        for test_id, file, name, _, duration, _ in timed:
+            lines.append(f"| `{file}` › {name} | {duration / 1000:.2f}s | {format_trend(*duration_trend(db, test_id))} |")
+        lines += ["", "</details>"]
+
+    known_flaky = sum(1 for test_id in rates if rate(test_id) >= threshold)
+    lines += ["", f"{len(current)} tests, {known_flaky} known flaky over the last {window} runs"]
+    new_failures = [row for row in failures if row[3] == "failed" and rate(row[0]) < threshold]
+    return "\n".join(lines), new_failures
+
+def git_output(*args):
+    result = subprocess.run(['git', *args], capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else ""
+
+def main():
+    parser = argparse.ArgumentParser(description="Index jest/Cypress results and report flaky and slow tests")
+    parser.add_argument('results', nargs='+', help="jest JSON or JUnit XML result files")
+    parser.add_argument('--suite', required=True, help="Suite name, e.g. unit or e2e")
+    parser.add_argument('--store', default=HISTORY_DB, help="SQLite history store")
+    parser.add_argument('--run-id', default=None, help="Unique run id (default: GitHub run id, attempt and suite)")
+    parser.add_argument('--sha', default=None, help="Commit of this run (default: HEAD)")
+    parser.add_argument('--window', type=int, default=50, help="Recent runs used for flake rates")
+    parser.add_argument('--keep', type=int, default=500, help="Runs kept per suite")
+    parser.add_argument('--threshold', type=float, default=0.05, help="Flake rate marking a test as known flaky")
+    parser.add_argument('--slowest', type=int, default=10, help="Number of slowest tests to list")
+    parser.add_argument('--fail-on-new-failures', action='store_true',
+                        help="Exit non-zero only for failures that are not known flakes")
+    parser.add_argument('--publish', action='store_true', help="Publish the report as a PR comment")
+    parser.add_argument('--pr', type=int, help="Pull request number (detected in GitHub Actions)")
+    args = parser.parse_args()
+
+    paths = [path for path in args.results if os.path.exists(path)]
+    if not paths:
+        print(f"❌ No result files found: {', '.join(args.results)}")
+        return False
+
+    run_id = args.run_id or (f"{os.getenv('GITHUB_RUN_ID')}.{os.getenv('GITHUB_RUN_ATTEMPT', '1')}:{args.suite}"
+                             if os.getenv('GITHUB_RUN_ID') else f"local-{int(time.time())}:{args.suite}")
+    sha = args.sha or git_output('rev-parse', 'HEAD')
+    ref = os.getenv('GITHUB_HEAD_REF') or os.getenv('GITHUB_REF_NAME') or git_output('rev-parse', '--abbrev-ref', 'HEAD')
+
+    db = open_store(args.store)
+    count = ingest(db, paths, run_id, sha, ref, args.suite)
+    prune(db, args.suite, args.keep)
+    print(f"🗂️  Indexed {count} results for {args.suite} run {run_id} ({sha[:7]})")
+
+    report, new_failures = build_report(db, run_id, args.suite, args.window, args.threshold, args.slowest)
+    db.close()
+    print(report)
+
+    if args.publish:
+        from github_client import current_pr_number, update_pr_comment
+        pr_number = args.pr or current_pr_number()
+        if pr_number is None:
+            print("⚠️  Could not determine the pull request number, skipping publish")
+        else:
+            update_pr_comment(pr_number, f"{REPORT_MARKER}-{args.suite}", report)
+
+    return not (new_failures and args.fail_on_new_failures)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Script to generate a content-hashed precache manifest for the service worker
+
+`npm run build` runs it after vite build. Every file in dist/ is hashed in
+a thread pool and listed in dist/precache-manifest.json with its revision.
+public/sw.js downloads only the entries whose revision changed since the
+last install. The manifest version is stamped into dist/sw.js so browsers
+see a new service worker whenever any asset changes.
+
+Revisions are cached between runs. Assets carrying a Vite content hash in
+their file name are reused when name and size match, and other files are
+reused when size and mtime match. Everything else is rehashed.
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import json
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from hash_cache import HashCache, file_digest
+
+MANIFEST_FILE = "precache-manifest.json"
+SERVICE_WORKER = "sw.js"
+CACHE_VERSION = 1
+DEFAULT_EXCLUDES = ["*.map", "stats.html", "workbox-*.js"]
+
+# Vite appends an 8 character content hash: assets/index-B3xk9_Qa.js
+HASHED_NAME = re.compile(r'-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$')
+# String token survives minification of the service worker bundle
+VERSION_TOKEN = re.compile(r'precache-version:(?:dev|[0-9a-f]{12})')
+
+def collect_files(dist_dir, excludes):
+    """Return {url: path} for every asset that should be precached"""
+    files = {}
+    for root, _, names in os.walk(dist_dir):
+        for name in names:
+            path = os.path.join(root, name)
+            relative = os.path.relpath(path, dist_dir).replace(os.sep, '/')
+            if relative in (MANIFEST_FILE, SERVICE_WORKER):
+                continue
+            if any(fnmatch.fnmatch(relative, pattern) or fnmatch.fnmatch(name, pattern) for pattern in excludes):
+                continue
+            files[f"/{relative}"] = path
+    return files
+
+def is_reusable(entry, url, stat):
+    if entry is None or entry["size"] != stat.st_size:
+        return False
+    return bool(HASHED_NAME.search(url)) or entry["mtime_ns"] == stat.st_mtime_ns
+
+def build_manifest(dist_dir, excludes, workers=None):
+    """Hash the build output, reusing cached revisions for unchanged files"""
+    cache = HashCache("precache-revisions", version=CACHE_VERSION)
+    files = collect_files(dist_dir, excludes)
+    stats = {url: os.stat(path) for url, path in files.items()}
+    pending = [url for url in files if not is_reusable(cache.get(url), url, stats[url])]
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for url, digest in zip(pending, pool.map(file_digest, [files[url] for url in pending])):
+            cache.put(url, {"size": stats[url].st_size, "mtime_ns": stats[url].st_mtime_ns,
+                            "revision": digest[:16]})
+
+    print(f"🔐 {len(files)} assets ({len(pending)} hashed, {len(files) - len(pending)} reused)")
+    cache.prune(files)
+    cache.save()
+
+    assets = [{"url": url, "revision": cache.get(url)["revision"]} for url in sorted(files)]
+    version = hashlib.sha256("\n".join(f"{a['url']} {a['revision']}" for a in assets).encode()).hexdigest()[:12]
+    return {"version": version, "assets": assets}
+
+def read_manifest(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def stamp_service_worker(path, version):
+    """Write the manifest version into the built service worker"""
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    stamped, count = VERSION_TOKEN.subn(f"precache-version:{version}", source)
+    if count == 0:
+        print(f"⚠️  No precache-version token found in {path}")
+        return False
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(stamped)
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the service worker precache manifest")
+    parser.add_argument('--dist', default='dist', help="Build output directory")
+    parser.add_argument('--exclude', action='append', default=[], help="Glob of files to leave out (repeatable)")
+    parser.add_argument('--workers', type=int, help="Hashing threads (default: Python's pool default)")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.dist):
+        print(f"❌ Build directory '{args.dist}' not found. Run `npm run build` first")
+        return False
+
+    manifest_path = os.path.join(args.dist, MANIFEST_FILE)
+    previous = read_manifest(manifest_path)
+    manifest = build_manifest(args.dist, DEFAULT_EXCLUDES + args.exclude, args.workers)
+
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    print(f"✅ {manifest_path} written (version {manifest['version']})")
+
+    if previous:
+        before = {a["url"]: a["revision"] for a in previous.get("assets", [])}
+        changed = sum(1 for a in manifest["assets"] if before.get(a["url"]) != a["revision"])
+        print(f"🔄 {changed} of {len(manifest['assets'])} assets changed since the previous manifest")
+
+    service_worker = os.path.join(args.dist, SERVICE_WORKER)
+    if not os.path.exists(service_worker):
+        print(f"⚠️  {service_worker} not found, service worker not stamped")
+        return True
+    return stamp_service_worker(service_worker, manifest["version"])
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Shared GitHub API helpers for the repository tooling scripts
+
+Requests go through a selectable transport: "http1" (default) uses a shared
+keep-alive requests session, and "http2" multiplexes concurrent calls over a
+single connection with httpx (pip install 'httpx[http2]'). Choose it with
+the GITHUB_TRANSPORT environment variable or set_transport().
+"""
+
+import asyncio
+import codecs
+import contextlib
+import hashlib
+import json
+import os
+import queue
+import re
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_URL = "https://api.github.com"
+REPO = os.getenv('GITHUB_REPOSITORY', 'BuildersWCT/stakingDapp')
+PR_INDEX_FILE = os.path.join(".cache", "tooling", "pr-index.json")
+PR_INDEX_VERSION = 3
+TRANSPORTS = ("http1", "http2")
+
+_transport = "http1"
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_github_token():
+    """Get GitHub token from environment"""
+    token = os.getenv('GITHUB_TOKEN')
+    if token:
+        return token
+
+    print("No GitHub token found. Please set GITHUB_TOKEN environment variable")
+    return None
+
+def api_headers(token):
+    """Build the standard GitHub API headers"""
+    return {
+        "Authorization": f"token {token}",
+        "Accept": "application/vnd.github.v3+json",
+        "Content-Type": "application/json"
+    }
+
+def set_transport(name):
+    """Select the transport used by github_request() and async_github_request()"""
+    global _transport
+    if name not in TRANSPORTS:
+        raise ValueError(f"Unknown transport '{name}', expected one of {', '.join(TRANSPORTS)}")
+    _transport = name
+
+def get_transport():
+    return _transport
+
+# A misspelled GITHUB_TRANSPORT fails at import instead of silently using http1
+set_transport(os.getenv('GITHUB_TRANSPORT') or 'http1')
+
+def sync_client(pool_size=32):
+    """Shared client for the current transport, created on first use"""
+    with _clients_lock:
+        client = _clients.get(_transport)
+        if client is None:
+            if _transport == "http2":
+                import httpx
+                client = httpx.Client(http2=True, timeout=30.0)
+            else:
+                client = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+                client.mount("https://", adapter)
+            _clients[_transport] = client
+        return client
+
+def close_clients():
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+def github_request(method, path, token=None, headers=None, **kwargs):
+    """Send an authenticated request to the GitHub REST API"""
+    token = token or get_github_token()
+    url = path if path.startswith("http") else f"{API_URL}{path}"
+    request_headers = api_headers(token)
+    request_headers.update(headers or {})
+    return sync_client().request(method, url, headers=request_headers, **kwargs)
+
+@contextlib.contextmanager
+def github_stream(method, path, token=None, headers=None, chunk_size=64 * 1024, **kwargs):
+    """Open a streamed request, yielding (response, byte_chunks) without reading the body"""
+    token = token or get_github_token()
+    url = path if path.startswith("http") else f"{API_URL}{path}"
+    request_headers = api_headers(token)
+    request_headers.update(headers or {})
+    client = sync_client()
+    if _transport == "http2":
+        with client.stream(method, url, headers=request_headers, **kwargs) as response:
+            yield response, response.iter_bytes(chunk_size)
+    else:
+        with client.request(method, url, headers=request_headers, stream=True, **kwargs) as response:
+            yield response, response.iter_content(chunk_size)
+
+def iter_json_array(chunks, items_key=None):
+    """Incrementally decode the elements of a JSON array from byte chunks
+
+    The array is either the whole document or the value of items_key in a
+    top-level object (e.g. "check_runs"). Only one element is held in memory
+    at a time, so peak memory does not grow with the response size.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder("utf-8")()
+    marker = f'"{items_key}"' if items_key else None
+    buffer = ""
+    in_array = False
+
+    for chunk in chunks:
+        buffer += text.decode(chunk)
+        pos = 0
+        if not in_array:
+            start = buffer.find(marker) if marker else 0
+            if start < 0:
+                # Keep enough of the tail to match a marker split across chunks
+                buffer = buffer[-len(marker):]
+                continue
+            bracket = buffer.find("[", start + len(marker or ""))
+            if bracket < 0:
+                # Marker found but its array starts in a later chunk
+                buffer = buffer[start:]
+                continue
+            in_array = True
+            pos = bracket + 1
+
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                break
+            if end == len(buffer) or buffer[end] not in " \t\r\n,]":
+                # A number may continue in the next chunk ("12" + "345", "1" + ".5"), so an
+                # element only counts once a delimiter follows; the closing ] always does
+                break
+            pos = end
+            yield item
+        buffer = buffer[pos:]
+
+def next_page_url(response):
+    """Extract the rel="next" URL from a GitHub Link header"""
+    for part in response.headers.get("Link", "").split(","):
+        url, _, rel = part.partition(";")
+        if 'rel="next"' in rel:
+            return url.strip().strip("<>")
+    return None
+
+def _stream_items(path, params, items_key, token):
+    url = path if path.startswith("http") else f"{API_URL}{path}"
+    first = True
+    while url:
+        with github_stream("GET", url, token, params=params if first else None) as (response, chunks):
+            if response.status_code != 200:
+                raise RuntimeError(f"GET {url} failed with status {response.status_code}")
+            url = next_page_url(response)
+            yield from iter_json_array(chunks, items_key)
+        first = False
+
+def iter_items(path, params=None, items_key=None, per_page=100, token=None, prefetch=0):
+    """Yield the items of a paginated list endpoint as they are parsed
+
+    Pages are followed through Link headers and parsed with iter_json_array(),
+    so downstream stages start on the first item before later pages arrive.
+    With prefetch=N a background thread keeps downloading while the caller
+    works, buffering at most N items.
+    """
+    params = dict(params or {}, per_page=per_page)
+    token = token or get_github_token()
+    if not prefetch:
+        yield from _stream_items(path, params, items_key, token)
+        return
+
+    items = queue.Queue(maxsize=prefetch)
+    stop = threading.Event()
+    done = object()
+
+    def offer(value):
+        while not stop.is_set():
+            try:
+                items.put(value, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        try:
+            for item in _stream_items(path, params, items_key, token):
+                if not offer(item):
+                    return
+            offer(done)
+        except Exception as e:
+            offer(e)
+
+    threading.Thread(target=produce, daemon=True).start()
+    try:
+        while True:
+            item = items.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+
+def iter_pull_requests(state="open", **params):
+    """Stream pull requests of the repository"""
+    return iter_items(f"/repos/{REPO}/pulls", dict(params, state=state))
+
+def iter_pr_files(pr_number):
+    """Stream the files changed by a pull request (GitHub caps this at 3000)"""
+    return iter_items(f"/repos/{REPO}/pulls/{pr_number}/files")
+
+def iter_check_runs(ref):
+    """Stream the check runs reported for a commit"""
+    return iter_items(f"/repos/{REPO}/commits/{ref}/check-runs", items_key="check_runs")
+
+async def async_github_request(client, method, path, token=None, headers=None, **kwargs):
+    """Async variant of github_request() using a client from async_client()"""
+    token = token or get_github_token()
+    url = path if path.startswith("http") else f"{API_URL}{path}"
+    request_headers = api_headers(token)
+    request_headers.update(headers or {})
+    if client is None:
+        # HTTP/1.1 without an async client: run the pooled session in a thread
+        return await asyncio.to_thread(sync_client().request, method, url, headers=request_headers, **kwargs)
+    return await client.request(method, url, headers=request_headers, **kwargs)
+
+def async_client():
+    """Create an httpx.AsyncClient for the http2 transport (None for http1)
+
+    The caller owns the client and should close it with `await client.aclose()`.
+    """
+    if _transport != "http2":
+        return None
+    import httpx
+    return httpx.AsyncClient(http2=True, timeout=30.0)
+
+def current_pr_number():
+    """Detect the pull request number when running inside GitHub Actions"""
+    event_path = os.getenv('GITHUB_EVENT_PATH')
+    if event_path and os.path.exists(event_path):
+        with open(event_path) as f:
+            event = json.load(f)
+        if 'pull_request' in event:
+            return event['pull_request']['number']
+
+    match = re.match(r'refs/pull/(\d+)/', os.getenv('GITHUB_REF', ''))
+    if match:
+        return int(match.group(1))
+    return None
+
+def update_pr_comment(pr_number, marker, content):
+    """Publish a report as a sticky PR comment, one per marker
+
+    Each report owns its comment, found by the hidden marker on its first
+    line, so jobs publishing in parallel never overwrite each other or the
+    PR description.
+    """
+    token = get_github_token()
+    if not token:
+        return False
+
+    tag = f"<!-- {marker} -->"
+    body = f"{tag}\n{content.strip()}\n"
+
+    try:
+        existing = next((comment for comment in iter_items(f"/repos/{REPO}/issues/{pr_number}/comments", token=token)
+                         if (comment.get("body") or "").startswith(tag)), None)
+        if existing:
+            response = github_request("PATCH", f"/repos/{REPO}/issues/comments/{existing['id']}", token, json={"body": body})
+            expected = 200
+        else:
+            response = github_request("POST", f"/repos/{REPO}/issues/{pr_number}/comments", token, json={"body": body})
+            expected = 201
+        if response.status_code != expected:
+            print(f"❌ Failed to publish {marker} on PR #{pr_number}: {response.status_code}")
+            print(f"Response: {response.text}")
+            return False
+
+        print(f"✅ {'Updated' if existing else 'Posted'} {marker} on PR #{pr_number}")
+        return True
+
+    except Exception as e:
+        print(f"❌ Error publishing PR comment: {e}")
+        return False
+
+def body_digest(body):
+    """Short content hash of a PR body, used to detect edits without storing bodies"""
+    return hashlib.sha256((body or "").encode()).hexdigest()[:16]
+
+def summarize_pr(pr):
+    """Keep the pull request fields the tooling scripts rely on"""
+    return {
+        "number": pr["number"],
+        "title": pr["title"],
+        "state": pr["state"],
+        "merged_at": pr.get("merged_at"),
+        "head_ref": pr["head"]["ref"],
+        # Fork PRs share branch names with this repository; None when the fork was deleted
+        "head_repo": (pr["head"].get("repo") or {}).get("full_name"),
+        "head_sha": pr["head"]["sha"],
+        "base_ref": pr["base"]["ref"],
+        "created_at": pr["created_at"],
+        "updated_at": pr["updated_at"],
+        "labels": [label["name"] for label in pr.get("labels", [])],
+        "body_sha": body_digest(pr.get("body"))
+    }
+
+def read_pr_index():
+    try:
+        with open(PR_INDEX_FILE) as f:
+            index = json.load(f)
+        if index.get("version") == PR_INDEX_VERSION:
+            return index
+    except (OSError, ValueError):
+        pass
+    return {"version": PR_INDEX_VERSION, "pages": {}, "etags": {}}
+
+def load_pr_index(refresh=True):
+    """Return {number: summary} for every PR, cached on disk
+
+    Pages are requested oldest first with If-None-Match, so unchanged pages
+    come back as 304 responses that do not count against the rate limit.
+    With refresh=False only the cached index is used (no network).
+    """
+    index = read_pr_index()
+    if refresh:
+        token = get_github_token()
+        if token:
+            page = 1
+            while True:
+                url = f"{API_URL}/repos/{REPO}/pulls?state=all&sort=created&direction=asc&per_page=100&page={page}"
+                headers = {"If-None-Match": index["etags"][url]} if url in index["etags"] else {}
+                response = github_request("GET", url, token, headers=headers)
+                if response.status_code == 200:
+                    index["pages"][url] = [summarize_pr(pr) for pr in response.json()]
+                    index["etags"][url] = response.headers.get("ETag", "")
+                elif response.status_code != 304:
+                    print(f"⚠️  Failed to refresh PR index: {response.status_code}")
+                    break
+                if len(index["pages"].get(url, [])) < 100:
+                    break
+                page += 1
+
+            os.makedirs(os.path.dirname(PR_INDEX_FILE), exist_ok=True)
+            with open(PR_INDEX_FILE, 'w') as f:
+                json.dump(index, f)
+
+    return {pr["number"]: pr for prs in index["pages"].values() for pr in prs}
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Content-hash keyed result cache shared by the repository tooling scripts
+"""
+
+import hashlib
+import json
+import os
+
+CACHE_DIR = os.getenv('TOOLING_CACHE_DIR', '.cache/tooling')
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the sha256 hex digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class HashCache:
+    """JSON-backed mapping of content hash to previously computed results"""
+
+    def __init__(self, name, version=1):
+        self.path = os.path.join(CACHE_DIR, f"{name}.json")
+        self.version = version
+        self.entries = {}
+        self.dirty = False
+
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get('version') == version:
+                self.entries = data.get('entries', {})
+        except (OSError, ValueError):
+            pass
+
+    def get(self, digest):
+        return self.entries.get(digest)
+
+    def put(self, digest, value):
+        self.entries[digest] = value
+        self.dirty = True
+
+    def prune(self, live_digests):
+        """Drop entries whose content no longer exists"""
+        stale = set(self.entries) - set(live_digests)
+        for digest in stale:
+            del self.entries[digest]
+        self.dirty = self.dirty or bool(stale)
+
+    def save(self):
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': self.version, 'entries': self.entries}, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
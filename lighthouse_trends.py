@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Script to ingest Lighthouse CI results into a local performance trend store
+
+Reads the lhr-*.json reports that `lhci autorun` leaves in .lighthouseci,
+takes the median of each metric over the runs of every URL and appends one
+compact JSON line per commit to the history store. The current run is
+compared with the latest main entry, and a metric is flagged as a regression
+when it falls outside the noise band (median ± k·MAD) of recent main runs.
+With --publish the comparison is kept in one sticky PR comment, edited in
+place on later runs.
+"""
+
+import argparse
+import glob
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlparse
+
+from hash_cache import CACHE_DIR
+
+HISTORY_FILE = os.path.join(CACHE_DIR, "lighthouse-history.jsonl")
+REPORT_MARKER = "lighthouse-report"
+
+# metric: (audit id, unit, minimum band so tiny absolute changes are not flagged)
+METRICS = {
+    "lcp": ("largest-contentful-paint", "ms", 100),
+    "tbt": ("total-blocking-time", "ms", 50),
+    "cls": ("cumulative-layout-shift", "", 0.01),
+    "weight": ("total-byte-weight", "B", 2048)
+}
+LABELS = {"lcp": "LCP", "tbt": "TBT", "cls": "CLS", "weight": "Bundle weight"}
+
+def page_key(url):
+    """Drop scheme and host so localhost ports do not split the history"""
+    return urlparse(url).path or "/"
+
+def read_reports(results_dir):
+    """Return {page: {metric: median}} from the Lighthouse JSON reports"""
+    samples = {}
+    for path in sorted(glob.glob(os.path.join(results_dir, "lhr-*.json"))):
+        with open(path) as f:
+            lhr = json.load(f)
+        page = samples.setdefault(page_key(lhr.get("requestedUrl") or lhr.get("finalUrl", "/")), {})
+        for metric, (audit, _, _) in METRICS.items():
+            value = lhr.get("audits", {}).get(audit, {}).get("numericValue")
+            if value is not None:
+                page.setdefault(metric, []).append(value)
+
+    return {
+        page: {metric: round(statistics.median(values), 4) if metric == "cls" else round(statistics.median(values))
+               for metric, values in metrics.items()}
+        for page, metrics in samples.items()
+    }
+
+def read_history(path):
+    entries = []
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    entries.append(json.loads(line))
+    except (OSError, ValueError):
+        pass
+    return entries
+
+def record(path, history, entry, keep):
+    """Append an entry (replacing any earlier run of the same commit) and trim the store"""
+    history = [e for e in history if e["sha"] != entry["sha"]] + [entry]
+    history = history[-keep:]
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        for e in history:
+            f.write(json.dumps(e, separators=(',', ':')) + "\n")
+    os.replace(tmp_path, path)
+    return history
+
+def noise_band(values, k, floor):
+    """Return (median, half-width) using the median absolute deviation"""
+    center = statistics.median(values)
+    mad = statistics.median(abs(v - center) for v in values)
+    return center, max(k * 1.4826 * mad, floor)
+
+def format_value(metric, value):
+    if value is None:
+        return "-"
+    unit = METRICS[metric][1]
+    if metric == "cls":
+        return f"{value:.3f}"
+    if unit == "B":
+        return f"{value / 1024:.1f} kB"
+    return f"{value:.0f} ms"
+
+def format_delta(metric, current, previous):
+    if current is None or previous is None:
+        return "🆕"
+    delta = current - previous
+    if delta == 0:
+        return "0"
+    sign = "+" if delta > 0 else "-"
+    return f"{sign}{format_value(metric, abs(delta))}"
+
+def compare(current, history, base_ref, window, k):
+    """Return rows of (page, metric, value, baseline, band, regressed)"""
+    main_runs = [e for e in history if e["ref"] == base_ref]
+    baseline = main_runs[-1]["pages"] if main_runs else {}
+    recent = main_runs[-window:]
+
+    rows = []
+    for page in sorted(current):
+        for metric in METRICS:
+            value = current[page].get(metric)
+            if value is None:
+                continue
+            previous = baseline.get(page, {}).get(metric)
+            past = [e["pages"][page][metric] for e in recent if metric in e["pages"].get(page, {})]
+            band = noise_band(past, k, METRICS[metric][2]) if len(past) >= 3 else None
+            # Every tracked metric is lower-is-better
+            regressed = band is not None and value > band[0] + band[1]
+            rows.append((page, metric, value, previous, band, regressed))
+    return rows
+
+def build_report(rows, base_ref, sha):
+    lines = [
+        "## 🚦 Lighthouse Report",
+        "",
+        f"Commit `{sha[:7]}` against `{base_ref}`",
+        "",
+        "| Page | Metric | Value | Δ vs " + base_ref + " | Noise band | |",
+        "|------|--------|-------|------|------------|---|"
+    ]
+    for page, metric, value, previous, band, regressed in rows:
+        band_text = (f"{format_value(metric, max(band[0] - band[1], 0))} – {format_value(metric, band[0] + band[1])}"
+                     if band else "_collecting history_")
+        status = "❌" if regressed else "✅"
+        lines.append(f"| `{page}` | {LABELS[metric]} | {format_value(metric, value)} "
+                     f"| {format_delta(metric, value, previous)} | {band_text} | {status} |")
+    if not rows:
+        lines.append("| _no Lighthouse results_ | | | | | |")
+    return "\n".join(lines)
+
+def git_output(*args):
+    result = subprocess.run(['git', *args], capture_output=True, text=True)
+    return result.stdout.strip() if result.returncode == 0 else ""
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest Lighthouse CI results into the performance trend store")
+    parser.add_argument('--results', default='.lighthouseci', help="Directory holding lhr-*.json reports")
+    parser.add_argument('--store', default=HISTORY_FILE, help="History store (JSON lines)")
+    parser.add_argument('--base', default=os.getenv('GITHUB_BASE_REF') or 'main', help="Baseline branch")
+    parser.add_argument('--ref', default=os.getenv('GITHUB_HEAD_REF') or os.getenv('GITHUB_REF_NAME'),
+                        help="Branch of this run (default: current branch)")
+    parser.add_argument('--sha', default=None, help="Commit of this run (default: HEAD)")
+    parser.add_argument('--window', type=int, default=20, help="Baseline runs used for the noise band")
+    parser.add_argument('--k', type=float, default=3.0, help="Noise band width in MADs")
+    parser.add_argument('--keep', type=int, default=1000, help="Maximum entries kept in the store")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Exit non-zero on regressions")
+    parser.add_argument('--publish', action='store_true', help="Publish the report as a PR comment")
+    parser.add_argument('--pr', type=int, help="Pull request number (detected in GitHub Actions)")
+    args = parser.parse_args()
+
+    current = read_reports(args.results)
+    if not current:
+        print(f"❌ No Lighthouse reports found in '{args.results}'. Run `lhci autorun` first")
+        return False
+
+    sha = args.sha or git_output('rev-parse', 'HEAD')
+    ref = args.ref or git_output('rev-parse', '--abbrev-ref', 'HEAD')
+    history = read_history(args.store)
+    # Compare before recording so a run is never part of its own baseline
+    rows = compare(current, [e for e in history if e["sha"] != sha], args.base, args.window, args.k)
+    record(args.store, history, {"sha": sha, "ref": ref, "time": int(time.time()), "pages": current}, args.keep)
+    print(f"📈 Recorded {len(current)} pages for {sha[:7]} ({ref}) in {args.store}")
+
+    report = build_report(rows, args.base, sha)
+    regressions = [row for row in rows if row[-1]]
+    if regressions:
+        report += "\n\n" + "\n".join(f"❌ {LABELS[metric]} on `{page}` is outside the {args.base} noise band"
+                                     for page, metric, *_ in regressions)
+    print(report)
+
+    if args.publish:
+        from github_client import current_pr_number, update_pr_comment
+        pr_number = args.pr or current_pr_number()
+        if pr_number is None:
+            print("⚠️  Could not determine the pull request number, skipping publish")
+        else:
+            update_pr_comment(pr_number, REPORT_MARKER, report)
+
+    return not (regressions and args.fail_on_regression)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Script to load test the subgraph queries used by the app (src/lib/subgraph.ts)
+
+Replays a weighted mix of the app's GraphQL queries with asyncio workers and
+reports throughput and p50/p99 latency. It also walks a user's full history
+page by page at increasing data sizes, once with the app's first/skip
+pagination and once with a (timestamp, id) cursor per collection, to show
+how skip degrades.
+
+Use --endpoint to target a real subgraph, or --local to start a stand-in
+server that serves synthetic data. The stand-in implements skip as an offset
+scan and the cursor as an index seek, which is how the indexer's database
+executes them, and reports how many rows the server had to walk. Like
+graph-node, the stand-in rejects skip values above 5000. Its transactions
+share timestamps the way transactions in one block do, so a walk that drops
+or repeats rows on timestamp ties is reported as an error.
+"""
+
+import argparse
+import asyncio
+import bisect
+import itertools
+import json
+import random
+import sys
+import time
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+PAGE_SIZE = 50
+# graph-node rejects larger skip values
+MAX_SKIP = 5000
+COLLECTIONS = ["stakes", "withdrawals", "rewardClaims", "emergencyWithdrawals"]
+
+TRANSACTION_FIELDS = "id user amount timestamp transactionHash blockNumber"
+
+# Same shape as GET_USER_TRANSACTIONS in src/lib/subgraph.ts
+SKIP_QUERY = "query GetUserTransactions($user: ID!, $first: Int, $skip: Int, $orderBy: String, $orderDirection: String) {\n" + "".join(
+    f"  {c}(where: {{ user: $user }}, first: $first, skip: $skip, orderBy: $orderBy, orderDirection: $orderDirection) {{ {TRANSACTION_FIELDS} }}\n"
+    for c in COLLECTIONS) + "}"
+
+# Keyset pagination on (timestamp, id), one cursor per collection: graph-node breaks
+# timestamp ties by id in the same direction, so rows sharing a timestamp are
+# neither skipped nor repeated across pages
+CURSOR_QUERY = "query GetUserTransactionsCursor($user: ID!, $first: Int, " + ", ".join(
+    f"${c}Timestamp: BigInt!, ${c}Id: ID!" for c in COLLECTIONS) + ") {\n" + "".join(
+    f"  {c}(where: {{ or: [{{ user: $user, timestamp_lt: ${c}Timestamp }}, "
+    f"{{ user: $user, timestamp: ${c}Timestamp, id_lt: ${c}Id }}] }}, "
+    f"first: $first, orderBy: timestamp, orderDirection: desc) {{ {TRANSACTION_FIELDS} }}\n"
+    for c in COLLECTIONS) + "}"
+
+GLOBAL_STATS_QUERY = """query GetGlobalStats {
+  globalStats(id: "global") { totalStaked totalStakes totalWithdrawals totalRewardsClaimed currentRewardRate lastUpdated }
+}"""
+
+DAILY_STATS_QUERY = """query GetDailyStats($first: Int) {
+  dailyStats_collection(first: $first, orderBy: date, orderDirection: desc) { id date totalStaked totalStakes averageStakeAmount currentRewardRate }
+}"""
+
+DEFAULT_MIX = "transactions=6,global=2,daily=2"
+MAX_TIMESTAMP = "99999999999"
+
+# ---------------------------------------------------------------------------
+# Local stand-in subgraph
+# ---------------------------------------------------------------------------
+
+class StandInSubgraph:
+    """Synthetic subgraph data with offset-scan skip and index-seek (timestamp, id) cursors"""
+
+    def __init__(self, sizes, users=20, days=365, seed=7):
+        rng = random.Random(seed)
+        self.rows = {}
+        self.sizes = {}
+        self.scanned = 0
+        for size in sizes:
+            self.add_user(f"0x{size:040x}", size, rng)
+            self.sizes[size] = f"0x{size:040x}"
+        for i in range(users):
+            self.add_user(f"0x{'f' * 32}{i:08x}", rng.randint(1, 200), rng)
+
+        now = int(time.time())
+        self.daily = [{"id": f"day-{d}", "date": time.strftime('%Y-%m-%d', time.gmtime(now - d * 86400)),
+                       "totalStaked": str(rng.randint(10**21, 10**24)), "totalStakes": str(rng.randint(1, 500)),
+                       "averageStakeAmount": str(rng.randint(10**18, 10**21)), "currentRewardRate": "1000"}
+                      for d in range(days)]
+
+    def add_user(self, user, size, rng):
+        per_collection = {}
+        timestamp = 1_700_000_000
+        block = 10_000_000
+        for index in range(size):
+            collection = COLLECTIONS[index % len(COLLECTIONS)]
+            # Batched transactions land in the same block, so timestamps repeat
+            if rng.random() < 0.1:
+                timestamp += rng.randint(12, 600)
+                block += 1
+            per_collection.setdefault(collection, []).append({
+                "id": f"0x{rng.getrandbits(256):064x}-{index}", "user": user,
+                "amount": str(rng.randint(10**15, 10**21)), "timestamp": str(timestamp),
+                "transactionHash": f"0x{rng.getrandbits(256):064x}", "blockNumber": str(block)
+            })
+        for collection in COLLECTIONS:
+            # Newest first, with an ascending (timestamp, id) index for cursor seeks
+            rows = sorted(per_collection.get(collection, []), key=lambda r: (int(r["timestamp"]), r["id"]), reverse=True)
+            keys = [(int(r["timestamp"]), r["id"]) for r in reversed(rows)]
+            self.rows[(user, collection)] = (rows, keys)
+
+    def execute(self, operation, variables):
+        if operation == "GetUserTransactions":
+            skip = variables.get("skip") or 0
+            first = variables.get("first") or 100
+            if skip > MAX_SKIP:
+                raise ValueError(f"The `skip` argument must be between 0 and {MAX_SKIP}, but is {skip}")
+            data = {}
+            for collection in COLLECTIONS:
+                rows, _ = self.rows.get((variables["user"], collection), ([], []))
+                # OFFSET semantics: the skipped rows are still walked
+                data[collection] = list(itertools.islice(iter(rows), skip, skip + first))
+                self.scanned += min(len(rows), skip) + len(data[collection])
+            return data
+
+        if operation == "GetUserTransactionsCursor":
+            first = variables.get("first") or 100
+            data = {}
+            for collection in COLLECTIONS:
+                rows, keys = self.rows.get((variables["user"], collection), ([], []))
+                cursor = (int(variables[f"{collection}Timestamp"]), variables[f"{collection}Id"])
+                # Rows before the cursor in (timestamp, id) order, newest first
+                start = len(keys) - bisect.bisect_left(keys, cursor)
+                data[collection] = rows[start:start + first]
+                self.scanned += len(data[collection])
+            return data
+
+        if operation == "GetGlobalStats":
+            return {"globalStats": {"totalStaked": "1000000000000000000000", "totalStakes": "1234",
+                                    "totalWithdrawals": "321", "totalRewardsClaimed": "88",
+                                    "currentRewardRate": "1000", "lastUpdated": str(int(time.time()))}}
+
+        if operation == "GetDailyStats":
+            return {"dailyStats_collection": self.daily[:variables.get("first") or 30]}
+
+        raise ValueError(f"Unknown operation {operation}")
+
+    async def handle(self, reader, writer):
+        """Minimal keep-alive HTTP/1.1 handler for GraphQL POSTs"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                try:
+                    payload = json.loads(body or b"{}")
+                    operation = payload.get("operationName") or payload.get("query", "").split()[1].split("(")[0]
+                    status, response = 200, {"data": self.execute(operation, payload.get("variables") or {})}
+                except Exception as e:
+                    status, response = 400, {"errors": [{"message": str(e)}]}
+
+                encoded = json.dumps(response).encode()
+                writer.write(f"HTTP/1.1 {status} {'OK' if status == 200 else 'Bad Request'}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(encoded)}\r\n\r\n".encode() + encoded)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+# ---------------------------------------------------------------------------
+# Load generation
+# ---------------------------------------------------------------------------
+
+class GraphQLClient:
+    """Async GraphQL poster using aiohttp when available, else urllib in threads"""
+
+    def __init__(self, endpoint, concurrency):
+        self.endpoint = endpoint
+        self.concurrency = concurrency
+        self.session = None
+
+    async def __aenter__(self):
+        if aiohttp is not None:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.concurrency))
+        return self
+
+    async def __aexit__(self, *exc):
+        if self.session is not None:
+            await self.session.close()
+
+    async def post(self, operation, query, variables):
+        payload = {"operationName": operation, "query": query, "variables": variables}
+        if self.session is not None:
+            async with self.session.post(self.endpoint, json=payload) as response:
+                response.raise_for_status()
+                result = await response.json()
+        else:
+            result = await asyncio.to_thread(self.post_blocking, payload)
+        if result.get("errors"):
+            raise RuntimeError(result["errors"][0].get("message"))
+        return result["data"]
+
+    def post_blocking(self, payload):
+        import urllib.request
+
+        request = urllib.request.Request(self.endpoint, data=json.dumps(payload).encode(),
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request) as response:
+            return json.loads(response.read())
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+def summarize(label, latencies, errors, elapsed):
+    return {
+        "label": label,
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput": len(latencies) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "elapsed_s": elapsed
+    }
+
+def parse_mix(spec):
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        weights[name.strip()] = float(weight or 1)
+    unknown = set(weights) - {"transactions", "global", "daily"}
+    if unknown:
+        raise SystemExit(f"❌ Unknown query types in mix: {', '.join(sorted(unknown))}")
+    return weights
+
+def mix_request(kind, users, rng):
+    if kind == "transactions":
+        return "GetUserTransactions", SKIP_QUERY, {
+            "user": rng.choice(users), "first": PAGE_SIZE, "skip": 0,
+            "orderBy": "timestamp", "orderDirection": "desc"}
+    if kind == "global":
+        return "GetGlobalStats", GLOBAL_STATS_QUERY, {}
+    return "GetDailyStats", DAILY_STATS_QUERY, {"first": 30}
+
+async def run_mix(client, users, weights, duration, concurrency, seed):
+    """Replay the weighted query mix for a fixed duration"""
+    latencies = {kind: [] for kind in weights}
+    errors = {kind: 0 for kind in weights}
+    kinds = list(weights)
+    deadline = time.perf_counter() + duration
+
+    async def worker(worker_id):
+        rng = random.Random(seed + worker_id)
+        while time.perf_counter() < deadline:
+            kind = rng.choices(kinds, weights=[weights[k] for k in kinds])[0]
+            operation, query, variables = mix_request(kind, users, rng)
+            started = time.perf_counter()
+            try:
+                await client.post(operation, query, variables)
+                latencies[kind].append(time.perf_counter() - started)
+            except Exception:
+                errors[kind] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return [summarize(kind, latencies[kind], errors[kind], elapsed) for kind in kinds]
+
+async def walk_history(client, user, mode, latencies):
+    """Fetch every page of a user's history with skip or cursor pagination, returning the row count"""
+    skip = 0
+    # Each collection keeps its own (timestamp, id) cursor; the id only matters on timestamp ties
+    cursors = {c: (MAX_TIMESTAMP, "") for c in COLLECTIONS}
+    seen = set()
+    while True:
+        started = time.perf_counter()
+        if mode == "skip":
+            data = await client.post("GetUserTransactions", SKIP_QUERY, {
+                "user": user, "first": PAGE_SIZE, "skip": skip, "orderBy": "timestamp", "orderDirection": "desc"})
+        else:
+            variables = {"user": user, "first": PAGE_SIZE}
+            for c, (timestamp, row_id) in cursors.items():
+                variables[f"{c}Timestamp"] = timestamp
+                variables[f"{c}Id"] = row_id
+            data = await client.post("GetUserTransactionsCursor", CURSOR_QUERY, variables)
+        latencies.append(time.perf_counter() - started)
+
+        for c in COLLECTIONS:
+            for row in data[c]:
+                if (c, row["id"]) in seen:
+                    raise RuntimeError(f"{mode} pagination returned {c} row {row['id']} twice")
+                seen.add((c, row["id"]))
+            if data[c]:
+                cursors[c] = (data[c][-1]["timestamp"], data[c][-1]["id"])
+        if not any(len(data[c]) == PAGE_SIZE for c in COLLECTIONS):
+            return len(seen)
+        skip += PAGE_SIZE
+
+async def run_pagination(client, users_by_size, concurrency, standin=None):
+    """Compare skip and cursor pagination for each data size"""
+    results = []
+    for size, user in sorted(users_by_size.items()):
+        for mode in ("skip", "cursor"):
+            latencies = []
+            scanned = standin.scanned if standin else 0
+            started = time.perf_counter()
+            walks = await asyncio.gather(*(walk_history(client, user, mode, latencies) for _ in range(concurrency)),
+                                         return_exceptions=True)
+            # The stand-in knows each history's length, so dropped rows count as errors too
+            errors = sum(isinstance(w, Exception) or (standin is not None and w != size) for w in walks)
+            result = summarize(f"{mode} @ {size}", latencies, errors, time.perf_counter() - started)
+            if standin:
+                result["scanned"] = standin.scanned - scanned
+            results.append(result)
+    return results
+
+def print_table(title, rows):
+    scanned = any("scanned" in r for r in rows)
+    print(f"\n## {title}\n")
+    print("| Scenario | Requests | Errors | Req/s | p50 (ms) | p99 (ms) | Elapsed (s) |" + (" Rows scanned |" if scanned else ""))
+    print("|----------|----------|--------|-------|----------|----------|-------------|" + ("--------------|" if scanned else ""))
+    for r in rows:
+        print(f"| {r['label']} | {r['requests']} | {r['errors']} | {r['throughput']:.1f} "
+              f"| {r['p50_ms']:.2f} | {r['p99_ms']:.2f} | {r['elapsed_s']:.2f} |"
+              + (f" {r.get('scanned', 0)} |" if scanned else ""))
+
+async def run(args):
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    server = None
+    standin = None
+    endpoint = args.endpoint
+
+    if args.local:
+        standin = StandInSubgraph(sizes)
+        server = await asyncio.start_server(standin.handle, "127.0.0.1", args.port)
+        endpoint = f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}/"
+        users_by_size = standin.sizes
+        mix_users = list(standin.sizes.values())
+        print(f"🧪 Stand-in subgraph listening on {endpoint}")
+    else:
+        if not args.users:
+            print("❌ --users is required with --endpoint (comma separated addresses)")
+            return False
+        mix_users = [u.lower() for u in args.users.split(",")]
+        users_by_size = {i: user for i, user in enumerate(mix_users)}
+
+    if aiohttp is None:
+        print("⚠️  aiohttp not installed, falling back to threaded urllib (pip install aiohttp)")
+
+    try:
+        async with GraphQLClient(endpoint, args.concurrency) as client:
+            if not args.skip_mix:
+                print(f"🚀 Replaying query mix '{args.mix}' for {args.duration}s with {args.concurrency} workers")
+                print_table("Query mix", await run_mix(client, mix_users, parse_mix(args.mix),
+                                                       args.duration, args.concurrency, args.seed))
+            if not args.skip_pagination:
+                print(f"📄 Walking full histories, page size {PAGE_SIZE}")
+                print_table("Skip vs cursor pagination", await run_pagination(client, users_by_size, args.walkers, standin))
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the app's subgraph queries")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--endpoint', help="Subgraph GraphQL endpoint")
+    target.add_argument('--local', action='store_true', help="Start a stand-in subgraph with synthetic data")
+    parser.add_argument('--port', type=int, default=0, help="Stand-in port (default: random free port)")
+    parser.add_argument('--users', help="Addresses to query with --endpoint (comma separated)")
+    parser.add_argument('--sizes', default="1000,10000,50000", help="Synthetic history sizes for --local")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help="Weighted query mix, e.g. transactions=6,global=2,daily=2")
+    parser.add_argument('--duration', type=float, default=10.0, help="Seconds to run the query mix")
+    parser.add_argument('--concurrency', type=int, default=16, help="Concurrent workers for the query mix")
+    parser.add_argument('--walkers', type=int, default=2, help="Concurrent full-history walks per scenario")
+    parser.add_argument('--seed', type=int, default=1, help="Random seed for the query mix")
+    parser.add_argument('--skip-mix', action='store_true', help="Only run the pagination comparison")
+    parser.add_argument('--skip-pagination', action='store_true', help="Only run the query mix")
+    args = parser.parse_args()
+
+    return asyncio.run(run(args))
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
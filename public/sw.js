@@ -24,13 +24,62 @@ const API_ENDPOINTS = [
 // Runtime cache for dynamic assets
 const RUNTIME_CACHE = 'crystal-stakes-runtime-v1';
 
+// Build output precache, driven by generate_precache_manifest.py
+const PRECACHE = 'crystal-stakes-precache';
+const PRECACHE_MANIFEST_URL = '/precache-manifest.json';
+// Stamped with the manifest version after each build so the worker updates
+const PRECACHE_VERSION = 'precache-version:dev';
+
+// Download only the build assets whose revision changed since the last install
+async function precacheChangedAssets() {
+  let response;
+  try {
+    response = await fetch(PRECACHE_MANIFEST_URL, { cache: 'no-store' });
+  } catch {
+    return;
+  }
+  // No manifest in development builds; SPA fallbacks answer with index.html instead of a 404
+  if (!response.ok || !(response.headers.get('content-type') || '').includes('json')) return;
+
+  let manifest;
+  try {
+    manifest = await response.json();
+  } catch {
+    return;
+  }
+  if (!Array.isArray(manifest.assets)) return;
+  const cache = await caches.open(PRECACHE);
+  const previous = await cache.match(PRECACHE_MANIFEST_URL);
+  const known = new Map(previous ? (await previous.json()).assets.map((asset) => [asset.url, asset.revision]) : []);
+  const changed = manifest.assets.filter((asset) => known.get(asset.url) !== asset.revision);
+
+  console.log(`Precaching ${changed.length} of ${manifest.assets.length} assets (${PRECACHE_VERSION})`);
+  await cache.addAll(changed.map((asset) => new Request(asset.url, { cache: 'reload' })));
+  await cache.put(PRECACHE_MANIFEST_URL, new Response(JSON.stringify(manifest), {
+    headers: { 'Content-Type': 'application/json' }
+  }));
+}
+
+// Drop precached assets that are no longer part of the current build
+async function prunePrecache() {
+  const cache = await caches.open(PRECACHE);
+  const stored = await cache.match(PRECACHE_MANIFEST_URL);
+  if (!stored) return;
+
+  const current = new Set((await stored.json()).assets.map((asset) => new URL(asset.url, self.location.origin).href));
+  current.add(new URL(PRECACHE_MANIFEST_URL, self.location.origin).href);
+  const requests = await cache.keys();
+  await Promise.all(requests.filter((request) => !current.has(request.url)).map((request) => cache.delete(request)));
+}
+
 // Install event - cache static assets
 self.addEventListener('install', (event) => {
   console.log('Service Worker installing.');
   event.waitUntil(
-    caches.open(STATIC_CACHE)
-      .then((cache) => cache.addAll(STATIC_ASSETS))
-      .then(() => self.skipWaiting())
+    Promise.all([
+      caches.open(STATIC_CACHE).then((cache) => cache.addAll(STATIC_ASSETS)),
+      precacheChangedAssets()
+    ]).then(() => self.skipWaiting())
   );
 });
 
@@ -41,13 +90,13 @@ self.addEventListener('activate', (event) => {
     caches.keys().then((cacheNames) => {
       return Promise.all(
         cacheNames.map((cacheName) => {
-          if (cacheName !== STATIC_CACHE && cacheName !== API_CACHE && cacheName !== RUNTIME_CACHE) {
+          if (cacheName !== STATIC_CACHE && cacheName !== API_CACHE && cacheName !== RUNTIME_CACHE && cacheName !== PRECACHE) {
             console.log('Deleting old cache:', cacheName);
             return caches.delete(cacheName);
           }
         })
       );
-    }).then(() => self.clients.claim())
+    }).then(() => prunePrecache()).then(() => self.clients.claim())
   );
 });
 
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Script to publish ESLint and tsc diagnostics as check-run annotations
+
+Parses ESLint JSON (`eslint . -f json -o reports/eslint.json`) and tsc output
+(`tsc --noEmit --pretty false`), keeps the diagnostics that fall on lines the
+pull request changed, and attaches them to a check run. GitHub accepts at
+most 50 annotations per request, so they are sent in chunks of 50 as
+concurrent updates to the same check run.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import Counter
+
+import github_client
+from github_client import REPO, async_github_request, current_pr_number, github_request, iter_pr_files
+
+CHECK_NAME = "Lint annotations"
+MAX_ANNOTATIONS_PER_REQUEST = 50
+TSC_DIAGNOSTIC = re.compile(r'^(?P<path>.+?)\((?P<line>\d+),(?P<column>\d+)\): (?P<level>error|warning) (?P<code>TS\d+): (?P<message>.*)$')
+HUNK_HEADER = re.compile(r'^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@')
+
+def repo_path(path, root):
+    path = os.path.relpath(path, root) if os.path.isabs(path) else os.path.normpath(path)
+    return path.replace(os.sep, '/')
+
+def parse_eslint(path, root):
+    """Yield annotations from an ESLint JSON report"""
+    with open(path) as f:
+        results = json.load(f)
+    for result in results:
+        file = repo_path(result["filePath"], root)
+        for message in result.get("messages", []):
+            line = message.get("line") or 1
+            end_line = message.get("endLine") or line
+            annotation = {
+                "path": file,
+                "start_line": line,
+                "end_line": end_line,
+                "annotation_level": "failure" if message.get("severity") == 2 else "warning",
+                "title": message.get("ruleId") or "eslint",
+                "message": message["message"]
+            }
+            if end_line == line and message.get("column"):
+                annotation["start_column"] = message["column"]
+                annotation["end_column"] = message.get("endColumn") or message["column"]
+            yield annotation
+
+def parse_tsc(path, root):
+    """Yield annotations from `tsc --pretty false` output (indented lines continue a message)
+
+    Output that contains no diagnostic at all (e.g. a compiler crash) raises
+    ValueError instead of passing as a clean run.
+    """
+    annotation = None
+    found = False
+    unrecognized = []
+    with open(path) as f:
+        for raw in f:
+            line = raw.rstrip("\n")
+            match = TSC_DIAGNOSTIC.match(line)
+            if not match and not annotation and line.strip():
+                unrecognized.append(line.strip())
+            if match:
+                found = True
+                if annotation:
+                    yield annotation
+                annotation = {
+                    "path": repo_path(match["path"], root),
+                    "start_line": int(match["line"]),
+                    "end_line": int(match["line"]),
+                    "start_column": int(match["column"]),
+                    "end_column": int(match["column"]),
+                    "annotation_level": "failure" if match["level"] == "error" else "warning",
+                    "title": match["code"],
+                    "message": match["message"]
+                }
+            elif annotation and line.startswith(" "):
+                annotation["message"] += "\n" + line.strip()
+            elif annotation:
+                yield annotation
+                annotation = None
+    if annotation:
+        yield annotation
+    if unrecognized and not found:
+        raise ValueError(f"Unrecognized tsc output: {unrecognized[0][:200]}")
+
+def added_lines(patch):
+    """Return the new-file line numbers added or modified by a unified diff patch"""
+    lines = set()
+    current = None
+    for line in (patch or "").splitlines():
+        header = HUNK_HEADER.match(line)
+        if header:
+            current = int(header.group(1))
+        elif current is None or line.startswith("\\"):
+            continue
+        elif line.startswith("+"):
+            lines.add(current)
+            current += 1
+        elif not line.startswith("-"):
+            current += 1
+    return lines
+
+def changed_lines_from_pr(pr_number):
+    return {f["filename"]: added_lines(f.get("patch")) for f in iter_pr_files(pr_number) if f["status"] != "removed"}
+
+def changed_lines_from_git(base):
+    result = subprocess.run(['git', 'diff', '--unified=0', '--no-color', f'{base}...HEAD'],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    diff = result.stdout
+    changed = {}
+    for chunk in re.split(r'^diff --git ', diff, flags=re.MULTILINE)[1:]:
+        match = re.search(r'^\+\+\+ b/(.+)$', chunk, re.MULTILINE)
+        if match:
+            changed[match.group(1)] = added_lines(chunk)
+    return changed
+
+def on_changed_lines(annotation, changed):
+    lines = changed.get(annotation["path"])
+    return bool(lines) and any(n in lines for n in range(annotation["start_line"], annotation["end_line"] + 1))
+
+def head_sha():
+    event_path = os.getenv('GITHUB_EVENT_PATH')
+    if event_path and os.path.exists(event_path):
+        with open(event_path) as f:
+            event = json.load(f)
+        if 'pull_request' in event:
+            return event['pull_request']['head']['sha']
+    return os.getenv('GITHUB_SHA') or subprocess.run(['git', 'rev-parse', 'HEAD'],
+                                                     capture_output=True, text=True).stdout.strip()
+
+def summarize(annotations, skipped):
+    levels = Counter(a["annotation_level"] for a in annotations)
+    rules = Counter(a["title"] for a in annotations)
+    lines = [f"**{levels['failure']} errors, {levels['warning']} warnings** on changed lines"
+             + (f" ({skipped} more outside the diff)" if skipped else "")]
+    if rules:
+        lines += ["", "| Rule | Count |", "|------|-------|"]
+        lines += [f"| `{rule}` | {count} |" for rule, count in rules.most_common(10)]
+    return "\n".join(lines)
+
+async def send_chunks(check_run_id, annotations, title, summary, concurrency):
+    """PATCH the check run with annotations in chunks of 50, several requests in flight"""
+    client = github_client.async_client()
+    semaphore = asyncio.Semaphore(concurrency)
+    path = f"/repos/{REPO}/check-runs/{check_run_id}"
+
+    async def send(chunk):
+        async with semaphore:
+            for attempt in range(3):
+                response = await async_github_request(client, "PATCH", path, json={
+                    "output": {"title": title, "summary": summary, "annotations": chunk}})
+                if response.status_code not in (403, 429) or attempt == 2:
+                    return response.status_code == 200
+                # Secondary rate limit: back off as instructed before retrying
+                await asyncio.sleep(float(response.headers.get("Retry-After", 2 ** attempt)))
+
+    chunks = [annotations[i:i + MAX_ANNOTATIONS_PER_REQUEST]
+              for i in range(0, len(annotations), MAX_ANNOTATIONS_PER_REQUEST)]
+    try:
+        results = await asyncio.gather(*(send(chunk) for chunk in chunks))
+    finally:
+        if client is not None:
+            await client.aclose()
+    return len(chunks), results.count(False)
+
+def publish(annotations, skipped, sha, concurrency):
+    levels = Counter(a["annotation_level"] for a in annotations)
+    title = f"{levels['failure']} errors, {levels['warning']} warnings"
+    summary = summarize(annotations, skipped)
+
+    response = github_request("POST", f"/repos/{REPO}/check-runs",
+                              json={"name": CHECK_NAME, "head_sha": sha, "status": "in_progress"})
+    if response.status_code != 201:
+        print(f"❌ Failed to create check run: {response.status_code}")
+        print(f"Response: {response.text}")
+        return False
+    check_run_id = response.json()["id"]
+
+    failed = 0
+    if annotations:
+        sent, failed = asyncio.run(send_chunks(check_run_id, annotations, title, summary, concurrency))
+        print(f"📤 Sent {len(annotations)} annotations in {sent} requests ({failed} failed)")
+
+    response = github_request("PATCH", f"/repos/{REPO}/check-runs/{check_run_id}", json={
+        "status": "completed",
+        "conclusion": "failure" if levels["failure"] else "success",
+        "output": {"title": title, "summary": summary}
+    })
+    if response.status_code != 200:
+        print(f"❌ Failed to complete check run: {response.status_code}")
+        return False
+    print(f"✅ {CHECK_NAME}: {response.json().get('html_url')}")
+    return failed == 0
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish ESLint and tsc diagnostics as check-run annotations")
+    parser.add_argument('--eslint', help="ESLint JSON report")
+    parser.add_argument('--tsc', help="tsc --pretty false output")
+    parser.add_argument('--base', default=os.getenv('GITHUB_BASE_REF') or 'main',
+                        help="Base branch used for changed lines when there is no PR")
+    parser.add_argument('--pr', type=int, help="Pull request number (detected in GitHub Actions)")
+    parser.add_argument('--all-lines', action='store_true', help="Annotate diagnostics outside the diff too")
+    parser.add_argument('--concurrency', type=int, default=4, help="Annotation requests in flight")
+    parser.add_argument('--dry-run', action='store_true', help="Print annotations instead of publishing")
+    args = parser.parse_args()
+
+    if not args.eslint and not args.tsc:
+        print("❌ Pass --eslint and/or --tsc")
+        return False
+
+    root = subprocess.run(['git', 'rev-parse', '--show-toplevel'], capture_output=True, text=True).stdout.strip() or os.getcwd()
+    diagnostics = []
+    # A missing or unreadable report means the tool crashed, which must fail the gate
+    for path, parse in ((args.eslint, parse_eslint), (args.tsc, parse_tsc)):
+        if not path:
+            continue
+        if not os.path.exists(path):
+            print(f"❌ Report '{path}' was not written, the linter did not complete")
+            return False
+        try:
+            diagnostics += parse(path, root)
+        except (ValueError, KeyError, TypeError) as e:
+            print(f"❌ Could not read report '{path}': {e}")
+            return False
+
+    if args.all_lines:
+        annotations = diagnostics
+    else:
+        pr_number = args.pr or current_pr_number()
+        if pr_number is not None:
+            try:
+                changed = changed_lines_from_pr(pr_number)
+            except Exception as e:
+                print(f"⚠️  Could not list the PR's files: {e}")
+                changed = None
+        else:
+            changed = changed_lines_from_git(args.base if '/' in args.base else f"origin/{args.base}")
+        if changed is None:
+            print(f"⚠️  Could not diff against {args.base}, annotating all diagnostics")
+            annotations = diagnostics
+        else:
+            annotations = [d for d in diagnostics if on_changed_lines(d, changed)]
+    skipped = len(diagnostics) - len(annotations)
+    print(f"🔎 {len(diagnostics)} diagnostics, {len(annotations)} on changed lines")
+
+    errors = sum(1 for d in diagnostics if d["annotation_level"] == "failure")
+    if args.dry_run:
+        for a in annotations:
+            print(f"  {a['annotation_level']}: {a['path']}:{a['start_line']} [{a['title']}] {a['message'].splitlines()[0]}")
+        print(summarize(annotations, skipped))
+        return errors == 0
+
+    # Publishing is best effort (fork PRs get a read-only token); only diagnostics gate the job
+    if not github_client.get_github_token():
+        print("⚠️  No token, skipping check-run annotations")
+    else:
+        try:
+            if not publish(annotations, skipped, head_sha(), args.concurrency):
+                print("⚠️  Annotations were not published, see the diagnostics above")
+        except Exception as e:
+            print(f"⚠️  Failed to publish annotations: {e}")
+    if errors:
+        print(f"❌ {errors} errors")
+        for d in diagnostics:
+            if d["annotation_level"] == "failure":
+                print(f"  {d['path']}:{d['start_line']} [{d['title']}] {d['message'].splitlines()[0]}")
+    return errors == 0
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""
+Script to publish a batch of pull requests, with an offline plan mode
+
+PR specs come from a JSON batch file (a list of {"title", "head", "base",
+"body" | "body_file"} objects) and/or from existing create_*_pr.py scripts,
+whose pr_data literal is read without running them.
+
+--plan validates every spec against local git refs, the cached PR index and
+the body rules, then prints what would be created, updated or skipped. It
+makes no network calls. Without --plan the same plan is computed from a
+refreshed index and applied.
+
+--push also pushes the heads of the PRs to create or update, and of open PRs
+whose branch has new local commits, in small
+`git push --porcelain` batches with a few pushes in flight. git reports ref
+status once a batch's pack is accepted, and each PR is created on a worker
+thread as soon as its branch is confirmed, so API calls overlap with the
+batches still uploading.
+"""
+
+import argparse
+import ast
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import sampling_profiler
+from github_client import REPO, body_digest, github_request, load_pr_index
+
+REMOTE = "origin"
+PUSH_BATCH_SIZE = 4
+PUSH_JOBS = 2
+MAX_TITLE_LENGTH = 256
+MAX_BODY_LENGTH = 65536
+
+def load_batch(path):
+    """Read PR specs from a JSON batch file"""
+    with open(path) as f:
+        data = json.load(f)
+    specs = data.get("prs", []) if isinstance(data, dict) else data
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for spec in specs:
+        if "body_file" in spec:
+            with open(os.path.join(base_dir, spec.pop("body_file"))) as f:
+                spec["body"] = f.read()
+        spec.setdefault("source", path)
+    return specs
+
+def load_script_spec(path):
+    """Extract the pr_data literal from a create_*_pr.py script without executing it"""
+    with open(path) as f:
+        tree = ast.parse(f.read(), filename=path)
+    for node in ast.walk(tree):
+        if (isinstance(node, ast.Assign) and isinstance(node.value, ast.Dict)
+                and any(isinstance(t, ast.Name) and t.id == "pr_data" for t in node.targets)):
+            spec = ast.literal_eval(node.value)
+            spec["source"] = path
+            return spec
+    raise ValueError(f"No pr_data literal found in {path}")
+
+def scan_refs():
+    """Return {branch: sha} for local branches and origin remote-tracking branches"""
+    output = subprocess.run(['git', 'for-each-ref', '--format=%(refname)%09%(objectname)',
+                             'refs/heads', f'refs/remotes/{REMOTE}'],
+                            capture_output=True, text=True, check=True).stdout
+    local, remote = {}, {}
+    for line in output.splitlines():
+        ref, sha = line.split('\t')
+        if ref.startswith('refs/heads/'):
+            local[ref[len('refs/heads/'):]] = sha
+        else:
+            remote[ref[len(f'refs/remotes/{REMOTE}/'):]] = sha
+    return local, remote
+
+def unmerged_branches(base):
+    """Branches (local and remote) with commits not yet in base, from one ref scan"""
+    output = subprocess.run(['git', 'for-each-ref', '--format=%(refname)', f'--no-merged={base}',
+                             'refs/heads', f'refs/remotes/{REMOTE}'],
+                            capture_output=True, text=True)
+    names = set()
+    for ref in output.stdout.split():
+        names.add(ref.split('/', 3)[-1] if ref.startswith('refs/remotes/') else ref[len('refs/heads/'):])
+    return names
+
+def validate(spec, local, remote, unmerged, pushing=False):
+    """Return a list of problems with one spec"""
+    problems = []
+    title, head, base, body = spec.get("title", ""), spec.get("head", ""), spec.get("base", ""), spec.get("body", "")
+    if not title.strip():
+        problems.append("missing title")
+    elif len(title) > MAX_TITLE_LENGTH:
+        problems.append(f"title is {len(title)} characters (max {MAX_TITLE_LENGTH})")
+    if len(body) > MAX_BODY_LENGTH:
+        problems.append(f"body is {len(body)} characters (max {MAX_BODY_LENGTH})")
+    if not head or not base:
+        problems.append("head and base are required")
+        return problems
+    if head == base:
+        problems.append("head and base are the same branch")
+    if pushing:
+        if head not in local:
+            problems.append(f"head '{head}' does not exist locally")
+    elif head not in remote:
+        problems.append(f"head '{head}' is not pushed to {REMOTE}" + (" (exists locally)" if head in local else ""))
+    elif head in local and local[head] != remote[head]:
+        problems.append(f"local '{head}' differs from {REMOTE}/{head}, push it first")
+    if base not in remote:
+        problems.append(f"base '{base}' does not exist on {REMOTE}")
+    if head in remote and base in remote and head not in unmerged.get(base, set()):
+        problems.append(f"'{head}' has no commits that are not already in '{base}'")
+    return problems
+
+def plan_batch(specs, prs, pushing=False):
+    """Classify every spec as create, update, skip or error"""
+    local, remote = scan_refs()
+    unmerged = {base: unmerged_branches(f"refs/remotes/{REMOTE}/{base}")
+                for base in {s.get("base") for s in specs if s.get("base") in remote}}
+    open_by_branch = {(pr["head_ref"], pr["base_ref"]): pr for pr in prs.values() if pr["state"] == "open"}
+    merged_heads = {(pr["head_ref"], pr["head_sha"]): pr for pr in prs.values() if pr["merged_at"]}
+
+    seen_heads = {}
+    plan = []
+    for spec in specs:
+        head, base = spec.get("head"), spec.get("base")
+        problems = validate(spec, local, remote, unmerged, pushing)
+        if head in seen_heads:
+            problems.append(f"head '{head}' is already used by {seen_heads[head]}")
+        seen_heads.setdefault(head, spec.get("source", "batch"))
+
+        existing = open_by_branch.get((head, base))
+        merged = merged_heads.get((head, (local if pushing else remote).get(head)))
+        if problems:
+            plan.append(("error", spec, None, problems))
+        elif merged:
+            plan.append(("skip", spec, merged, [f"already merged as #{merged['number']}"]))
+        elif existing is None:
+            plan.append(("create", spec, None, []))
+        else:
+            changes = []
+            if existing["title"] != spec["title"]:
+                changes.append("title")
+            if existing.get("body_sha") != body_digest(spec.get("body")):
+                changes.append("body")
+            notes = [f"changes {', '.join(changes)}"] if changes else ["up to date"]
+            if pushing and local.get(head) != remote.get(head):
+                notes.append("new commits to push")
+            plan.append(("update" if changes else "skip", spec, existing, notes))
+    return plan
+
+def print_plan(plan):
+    symbols = {"create": "+", "update": "~", "skip": "=", "error": "!"}
+    for action, spec, existing, notes in plan:
+        target = f"#{existing['number']}" if existing else f"{spec.get('head')} → {spec.get('base')}"
+        print(f"  {symbols[action]} {action:<6} {target}  {spec.get('title', '')}")
+        for note in notes:
+            print(f"      {note}")
+    counts = {action: sum(1 for p in plan if p[0] == action) for action in symbols}
+    print(f"\n📋 {counts['create']} to create, {counts['update']} to update, "
+          f"{counts['skip']} unchanged, {counts['error']} invalid")
+    return counts
+
+def apply_one(action, spec, existing):
+    """Create or update one pull request, returning True on success"""
+    if action == "create":
+        response = github_request("POST", f"/repos/{REPO}/pulls", json={
+            "title": spec["title"], "head": spec["head"], "base": spec["base"], "body": spec.get("body", "")})
+        expected = 201
+    elif action == "update":
+        response = github_request("PATCH", f"/repos/{REPO}/pulls/{existing['number']}", json={
+            "title": spec["title"], "body": spec.get("body", "")})
+        expected = 200
+    else:
+        return True
+
+    if response.status_code == expected:
+        pr = response.json()
+        print(f"✅ {action.capitalize()}d #{pr['number']}: {pr['html_url']}")
+        return True
+    print(f"❌ Failed to {action} {spec['head']}: {response.status_code}")
+    print(f"Response: {response.text}")
+    return False
+
+def apply_plan(plan):
+    results = [apply_one(action, spec, existing) for action, spec, existing, _ in plan]
+    return all(results)
+
+def parse_porcelain(line):
+    """Parse a `git push --porcelain` ref line into (flag, local ref, remote ref, summary)"""
+    parts = line.rstrip("\n").split("\t")
+    if len(parts) < 3 or len(parts[0]) != 1:
+        return None
+    source, _, destination = parts[1].partition(":")
+    return parts[0], source, destination, parts[2]
+
+def push_batch(batch, entries, api_pool, started):
+    """Run one git push, submitting each confirmed branch's PR; returns (jobs, failures)"""
+    refspecs = [f"refs/heads/{head}:refs/heads/{head}" for head in batch]
+    process = subprocess.Popen(['git', 'push', '--porcelain', REMOTE, *refspecs],
+                               stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1)
+    jobs, failures, reported = [], [], set()
+    for line in process.stdout:
+        parsed = parse_porcelain(line)
+        if parsed is None:
+            if line.startswith(("error:", "fatal:")):
+                print(f"   {line.rstrip()}")
+            continue
+        flag, _, destination, summary = parsed
+        head = destination[len("refs/heads/"):]
+        reported.add(head)
+        if flag == "!":
+            print(f"❌ Push rejected for {head}: {summary}")
+            failures.append(head)
+            continue
+        print(f"📌 {head} {'up to date' if flag == '=' else 'pushed'} ({time.perf_counter() - started:.1f}s)")
+        jobs.append((head, api_pool.submit(apply_one, *entries[head])))
+    process.wait()
+    for head in batch:
+        if head not in reported:
+            print(f"❌ No push result for {head} (git exited with {process.returncode})")
+            failures.append(head)
+    return jobs, failures
+
+def push_and_publish(plan, batch_size, push_jobs, concurrency):
+    """Push the heads to create or update and publish each PR as soon as its ref update is confirmed"""
+    local, remote = scan_refs()
+
+    def needs_push(action, spec, existing):
+        if action in ("create", "update"):
+            return True
+        # Open PRs with unchanged metadata still get their new commits; merged heads are
+        # never pushed, so deleted merged branches stay deleted
+        return (action == "skip" and existing is not None and not existing.get("merged_at")
+                and local.get(spec["head"]) != remote.get(spec["head"]))
+
+    entries = {spec["head"]: (action, spec, existing) for action, spec, existing, _ in plan
+               if needs_push(action, spec, existing)}
+    heads = list(entries)
+    batches = [heads[i:i + batch_size] for i in range(0, len(heads), batch_size)]
+    started = time.perf_counter()
+    failures = []
+    jobs = []
+
+    print(f"⬆️  Pushing {len(heads)} branches to {REMOTE} in {len(batches)} batches, {push_jobs} at a time")
+    with ThreadPoolExecutor(max_workers=concurrency) as api_pool, \
+            ThreadPoolExecutor(max_workers=push_jobs) as push_pool:
+        pushes = [push_pool.submit(push_batch, batch, entries, api_pool, started) for batch in batches]
+        for push in pushes:
+            batch_jobs, batch_failures = push.result()
+            jobs += batch_jobs
+            failures += batch_failures
+        failures += [head for head, job in jobs if not job.result()]
+
+    print(f"\n⏱️  {len(heads)} branches pushed and published in {time.perf_counter() - started:.1f}s, "
+          f"{len(failures)} failed{': ' + ', '.join(failures) if failures else ''}")
+    return not failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Publish a batch of pull requests")
+    parser.add_argument('batch', nargs='?', help="JSON batch file of PR specs")
+    parser.add_argument('--from-script', action='append', default=[], metavar='SCRIPT',
+                        help="Read the PR spec from a create_*_pr.py script (repeatable)")
+    parser.add_argument('--plan', action='store_true', help="Validate offline and print the plan only")
+    parser.add_argument('--push', action='store_true', help="Push the head branches and publish as each lands")
+    parser.add_argument('--push-batch', type=int, default=PUSH_BATCH_SIZE, help="Branches per git push invocation")
+    parser.add_argument('--push-jobs', type=int, default=PUSH_JOBS, help="git push invocations in flight")
+    parser.add_argument('--concurrency', type=int, default=4, help="PRs published in parallel while pushing")
+    parser.add_argument('--profile', action='store_true',
+                        help="Write a sampling profile of this run (same as TOOLING_PROFILE=1)")
+    args = parser.parse_args()
+
+    if args.profile:
+        sampling_profiler.start("publish_prs")
+    else:
+        sampling_profiler.start_from_env()
+
+    specs = load_batch(args.batch) if args.batch else []
+    try:
+        specs += [load_script_spec(path) for path in args.from_script]
+    except (OSError, SyntaxError, ValueError) as e:
+        print(f"❌ {e}")
+        return False
+    if not specs:
+        print("❌ No PR specs given (pass a batch file or --from-script)")
+        return False
+
+    prs = load_pr_index(refresh=not args.plan)
+    plan = plan_batch(specs, prs, pushing=args.push)
+    print(f"\n📋 Plan for {len(specs)} pull requests{' (offline)' if args.plan else ''}:")
+    counts = print_plan(plan)
+
+    if args.plan:
+        return counts["error"] == 0
+    if counts["error"]:
+        print("❌ Fix the invalid specs before publishing")
+        return False
+    if args.push:
+        return push_and_publish(plan, max(args.push_batch, 1), max(args.push_jobs, 1), args.concurrency)
+    return apply_plan(plan)
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,426 @@
+#!/usr/bin/env python3
+"""
+Script to replay an exported staking event log and verify the subgraph entities
+
+Reproduces the User, GlobalStats and DailyStats entities built by
+subgraph/src/mapping.ts using columnar NumPy aggregation instead of a
+per-event loop, then diffs them against what the deployed subgraph serves.
+
+Event logs are JSONL (or Parquet with pyarrow installed), one event per row:
+
+    {"event": "Staked", "blockNumber": 123, "blockTimestamp": 1700000000,
+     "logIndex": 0, "args": {"user": "0xabc...", "amount": "1000000000000000000",
+     "timestamp": "1700000000", "newTotalStaked": "...", "currentRewardRate": "..."}}
+
+uint256 values may be JSON numbers or decimal strings. They are summed exactly
+by splitting them into 30-bit int64 limbs, so nothing is lost to float or
+int64 overflow.
+
+Logs are read column by column; with pyarrow installed JSONL is parsed by its
+multithreaded reader too, otherwise in a single json.loads call.
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+import numpy as np
+
+STAKED = 0
+WITHDRAWN = 1
+REWARDS_CLAIMED = 2
+EMERGENCY_WITHDRAWN = 3
+REWARD_RATE_UPDATED = 4
+
+EVENT_CODES = {
+    "Staked": STAKED,
+    "Withdrawn": WITHDRAWN,
+    "RewardsClaimed": REWARDS_CLAIMED,
+    "EmergencyWithdrawn": EMERGENCY_WITHDRAWN,
+    "RewardRateUpdated": REWARD_RATE_UPDATED
+}
+
+SECONDS_PER_DAY = 86400
+LIMB_BITS = 30
+LIMB_MASK = (1 << LIMB_BITS) - 1
+
+USER_FIELDS = ["stakedAmount", "totalRewardsClaimed", "totalEmergencyWithdrawals",
+               "lastStakeTimestamp", "createdAt", "updatedAt"]
+GLOBAL_FIELDS = ["totalStaked", "totalUsers", "totalStakes", "totalWithdrawals", "totalRewardsClaimed",
+                 "totalEmergencyWithdrawals", "currentRewardRate", "lastUpdated"]
+DAILY_FIELDS = ["date", "totalStaked", "totalUsers", "totalStakes", "totalWithdrawals", "totalRewardsClaimed",
+                "totalEmergencyWithdrawals", "averageStakeAmount", "currentRewardRate"]
+
+ROW_FIELDS = ["event", "blockNumber", "blockTimestamp", "logIndex"]
+ARG_FIELDS = ["user", "amount", "timestamp", "newTotalStaked", "currentRewardRate", "newRate"]
+
+def table_columns(table):
+    """Map the fields of a pyarrow table (args as a struct column) to its columns"""
+    table = table.flatten()
+    columns = {}
+    for name in ROW_FIELDS + ARG_FIELDS:
+        key = name if name in ROW_FIELDS else f"args.{name}"
+        columns[name] = table.column(key) if key in table.column_names else None
+    return columns
+
+def read_jsonl_table(path):
+    """Parse JSONL with pyarrow's multithreaded reader, or None when pyarrow can't keep the values exact"""
+    try:
+        import pyarrow as pa
+        import pyarrow.json as pj
+    except ImportError:
+        return None
+    try:
+        table = pj.read_json(path)
+    except pa.ArrowInvalid:
+        # e.g. a uint256 field that is a number in some rows and a string in others
+        return None
+    columns = table_columns(table)
+    if any(column is not None and pa.types.is_floating(column.type) for column in columns.values()):
+        # Numbers beyond int64 are inferred as doubles, which would lose precision
+        return None
+    return columns
+
+def read_columns(path):
+    """Read a JSONL or Parquet export as {field: column}, with args flattened into their own columns
+
+    Columns are pyarrow arrays when pyarrow is installed and lists otherwise.
+    Fields absent from the export are None, values missing from a row are 0.
+    """
+    if path.endswith('.parquet'):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("❌ Reading Parquet requires pyarrow (pip install pyarrow)")
+        return table_columns(pq.read_table(path))
+
+    columns = read_jsonl_table(path)
+    if columns is not None:
+        return columns
+
+    # One decode call for the whole file instead of one per line
+    with open(path) as f:
+        rows = json.loads("[" + ",".join(line for line in f if line.strip()) + "]")
+    args = [row.get("args") or {} for row in rows]
+    columns = {name: [row.get(name, 0) for row in rows] for name in ROW_FIELDS}
+    columns.update((name, [arg.get(name, 0) for arg in args]) for name in ARG_FIELDS)
+    columns["user"] = [arg.get("user") for arg in args]
+    return columns
+
+def int_column(column, rows, dtype=object):
+    """Select rows of a column as ints (missing values are 0); object dtype keeps uint256 exact"""
+    if column is None:
+        return np.zeros(len(rows), dtype=dtype)
+    if hasattr(column, "to_numpy"):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        if pa.types.is_null(column.type):
+            return np.zeros(len(rows), dtype=dtype)
+        if pa.types.is_integer(column.type):
+            return pc.fill_null(column, 0).to_numpy()[rows].astype(dtype)
+        column = pc.fill_null(column, "0")
+        try:
+            # Decimal strings that fit in int64 convert without a Python loop
+            return pc.cast(column, pa.int64()).to_numpy()[rows].astype(dtype)
+        except pa.ArrowInvalid:
+            column = column.to_pylist()
+    return np.array(list(map(int, np.array(column, dtype=object)[rows])), dtype=dtype)
+
+def event_codes(column):
+    """EVENT_CODES of an event name column, -1 for events the mapping ignores"""
+    if hasattr(column, "to_numpy"):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        index = pc.fill_null(pc.index_in(column, value_set=pa.array(list(EVENT_CODES))), -1).to_numpy()
+        # Index -1 (not found) picks the trailing -1
+        return np.array([*EVENT_CODES.values(), -1], dtype=np.int8)[index]
+    return np.array([EVENT_CODES.get(name, -1) for name in column], dtype=np.int8)
+
+def user_ids(column, rows):
+    """Dense ids of the lowercased user addresses in rows (-1 for none) and the addresses in id order"""
+    if column is None:
+        return np.full(len(rows), -1, dtype=np.int64), []
+    if hasattr(column, "to_numpy"):
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        lowered = pc.utf8_lower(column.take(pa.array(rows)).combine_chunks())
+        lowered = pc.if_else(pc.equal(lowered, ""), pa.scalar(None, pa.string()), lowered)
+        # Dictionary entries are in order of first appearance, like the list path below
+        encoded = pc.dictionary_encode(lowered)
+        return pc.fill_null(encoded.indices, -1).to_numpy().astype(np.int64), encoded.dictionary.to_pylist()
+
+    users = {}
+    addresses = np.array(column, dtype=object)[rows]
+    ids = np.array([users.setdefault(user.lower(), len(users)) if user else -1 for user in addresses],
+                   dtype=np.int64)
+    return ids, sorted(users, key=users.get)
+
+def load_events(path):
+    """Load an event log into columns sorted by (blockNumber, logIndex)"""
+    columns = read_columns(path)
+    codes = event_codes(columns["event"])
+    rows = np.flatnonzero(codes >= 0)
+    codes = codes[rows]
+    ids, users = user_ids(columns["user"], rows)
+
+    rates = np.where(codes == REWARD_RATE_UPDATED,
+                     int_column(columns["newRate"], rows), int_column(columns["currentRewardRate"], rows))
+    order = np.lexsort((int_column(columns["logIndex"], rows, np.int64),
+                        int_column(columns["blockNumber"], rows, np.int64)))
+    return {
+        "event": codes[order],
+        "timestamp": int_column(columns["blockTimestamp"], rows, np.int64)[order],
+        "user": ids[order],
+        "amount": int_column(columns["amount"], rows)[order],
+        "args_timestamp": int_column(columns["timestamp"], rows)[order],
+        "new_total": int_column(columns["newTotalStaked"], rows)[order],
+        "rate": rates[order],
+        "users": users
+    }
+
+def to_limbs(values):
+    """Split arbitrary precision non-negative ints into an (n, k) int64 limb matrix"""
+    top = int(values.max()).bit_length() if len(values) else 0
+    count = max(1, -(-top // LIMB_BITS))
+    limbs = np.empty((len(values), count), dtype=np.int64)
+    for k in range(count):
+        limbs[:, k] = ((values >> (k * LIMB_BITS)) & LIMB_MASK).astype(np.int64)
+    return limbs
+
+def group_sums(keys, values, size):
+    """Exact per-key sums of big ints, returned as a list of Python ints of length size"""
+    totals = [0] * size
+    if len(keys) == 0:
+        return totals
+
+    order = np.argsort(keys, kind='stable')
+    sorted_keys = keys[order]
+    starts = np.flatnonzero(np.r_[True, sorted_keys[1:] != sorted_keys[:-1]])
+    limb_sums = np.add.reduceat(to_limbs(values[order]), starts, axis=0)
+    weights = np.array([1 << (k * LIMB_BITS) for k in range(limb_sums.shape[1])], dtype=object)
+    for key, value in zip(sorted_keys[starts], limb_sums.astype(object).dot(weights)):
+        totals[key] = int(value)
+    return totals
+
+def group_counts(keys, size):
+    return np.bincount(keys, minlength=size).astype(np.int64)
+
+def last_index(keys, size):
+    """Index of the last row per key (rows are chronological), -1 when absent"""
+    result = np.full(size, -1, dtype=np.int64)
+    if len(keys):
+        unique, reversed_first = np.unique(keys[::-1], return_index=True)
+        result[unique] = len(keys) - 1 - reversed_first
+    return result
+
+def first_index(keys, size):
+    result = np.full(size, -1, dtype=np.int64)
+    if len(keys):
+        unique, first = np.unique(keys, return_index=True)
+        result[unique] = first
+    return result
+
+def pick(column, rows, indexes, default=0):
+    """Gather column values at positions indexes into rows, using default for -1"""
+    return [int(column[rows[i]]) if i >= 0 else default for i in indexes]
+
+def replay(events):
+    """Aggregate the event columns into User, GlobalStats and DailyStats entities"""
+    event = events["event"]
+    user = events["user"]
+    timestamp = events["timestamp"]
+    num_users = len(events["users"])
+
+    def rows_of(*codes):
+        return np.flatnonzero(np.isin(event, codes))
+
+    staked = rows_of(STAKED)
+    withdrawn = rows_of(WITHDRAWN)
+    claimed = rows_of(REWARDS_CLAIMED)
+    emergency = rows_of(EMERGENCY_WITHDRAWN)
+    user_rows = rows_of(STAKED, WITHDRAWN, REWARDS_CLAIMED, EMERGENCY_WITHDRAWN)
+    total_rows = rows_of(STAKED, WITHDRAWN, EMERGENCY_WITHDRAWN)
+    rate_rows = rows_of(STAKED, WITHDRAWN, REWARD_RATE_UPDATED)
+
+    # User: created by any user event, createdAt only set by the first Staked
+    stake_sums = group_sums(user[staked], events["amount"][staked], num_users)
+    withdraw_sums = group_sums(user[withdrawn], events["amount"][withdrawn], num_users)
+    emergency_sums = group_sums(user[emergency], events["amount"][emergency], num_users)
+    claim_sums = group_sums(user[claimed], events["amount"][claimed], num_users)
+    emergency_counts = group_counts(user[emergency], num_users)
+    last_stake = last_index(user[staked], num_users)
+    first_stake = first_index(user[staked], num_users)
+    last_update = last_index(user[user_rows], num_users)
+
+    last_stake_ts = pick(events["args_timestamp"], staked, last_stake)
+    created_at = pick(timestamp, staked, first_stake)
+    updated_at = pick(timestamp, user_rows, last_update)
+
+    users = {}
+    for i, address in enumerate(events["users"]):
+        users[address] = {
+            "stakedAmount": stake_sums[i] - withdraw_sums[i] - emergency_sums[i],
+            "totalRewardsClaimed": claim_sums[i],
+            "totalEmergencyWithdrawals": int(emergency_counts[i]),
+            "lastStakeTimestamp": last_stake_ts[i],
+            "createdAt": created_at[i],
+            "updatedAt": updated_at[i]
+        }
+
+    # GlobalStats: note totalRewardsClaimed counts claims, totalUsers is never incremented
+    global_stats = {}
+    if len(event):
+        global_stats["global"] = {
+            "totalStaked": int(events["new_total"][total_rows[-1]]) if len(total_rows) else 0,
+            "totalUsers": 0,
+            "totalStakes": len(staked),
+            "totalWithdrawals": len(withdrawn),
+            "totalRewardsClaimed": len(claimed),
+            "totalEmergencyWithdrawals": len(emergency),
+            "currentRewardRate": int(events["rate"][rate_rows[-1]]) if len(rate_rows) else 0,
+            "lastUpdated": int(timestamp[-1])
+        }
+
+    # DailyStats: buckets by block timestamp, fields hold the day's last written value
+    days, day = np.unique(timestamp // SECONDS_PER_DAY * SECONDS_PER_DAY, return_inverse=True)
+    num_days = len(days)
+    stake_counts = group_counts(day[staked], num_days)
+    last_total = pick(events["new_total"], total_rows, last_index(day[total_rows], num_days))
+    last_rate = pick(events["rate"], rate_rows, last_index(day[rate_rows], num_days))
+    last_stake_total = pick(events["new_total"], staked, last_index(day[staked], num_days))
+    withdrawal_counts = group_counts(day[withdrawn], num_days)
+    claim_counts = group_counts(day[claimed], num_days)
+    emergency_day_counts = group_counts(day[emergency], num_days)
+
+    daily_stats = {}
+    for i, day_start in enumerate(days):
+        date = datetime.fromtimestamp(int(day_start), tz=timezone.utc).strftime('%Y-%m-%d')
+        daily_stats[date] = {
+            "date": date,
+            "totalStaked": last_total[i],
+            "totalUsers": 0,
+            "totalStakes": int(stake_counts[i]),
+            "totalWithdrawals": int(withdrawal_counts[i]),
+            "totalRewardsClaimed": int(claim_counts[i]),
+            "totalEmergencyWithdrawals": int(emergency_day_counts[i]),
+            # Only recomputed on Staked, from that event's newTotalStaked
+            "averageStakeAmount": last_stake_total[i] // int(stake_counts[i]) if stake_counts[i] else 0,
+            "currentRewardRate": last_rate[i]
+        }
+
+    return {"User": users, "GlobalStats": global_stats, "DailyStats": daily_stats}
+
+def graphql(endpoint, query, variables):
+    import requests
+
+    response = requests.post(endpoint, json={"query": query, "variables": variables})
+    response.raise_for_status()
+    payload = response.json()
+    if payload.get("errors"):
+        raise RuntimeError(payload["errors"][0].get("message"))
+    return payload["data"]
+
+def fetch_collection(endpoint, field, fields, block):
+    """Page through an entity collection using id cursors"""
+    query = f"""
+      query Page($lastId: String!, $block: Block_height) {{
+        {field}(first: 1000, orderBy: id, where: {{ id_gt: $lastId }}, block: $block) {{
+          id {' '.join(fields)}
+        }}
+      }}
+    """
+    entities = {}
+    last_id = ""
+    while True:
+        page = graphql(endpoint, query, {"lastId": last_id, "block": block})[field]
+        for entity in page:
+            entities[entity.pop("id")] = entity
+        if len(page) < 1000:
+            return entities
+        last_id = page[-1]["id"]
+
+def fetch_subgraph(endpoint, block_number=None):
+    """Fetch the served User, GlobalStats and DailyStats entities"""
+    block = {"number": block_number} if block_number is not None else None
+    global_query = f"""
+      query Global($block: Block_height) {{
+        globalStats(id: "global", block: $block) {{ {' '.join(GLOBAL_FIELDS)} }}
+      }}
+    """
+    served_global = graphql(endpoint, global_query, {"block": block})["globalStats"]
+    return {
+        "User": fetch_collection(endpoint, "users", USER_FIELDS, block),
+        "GlobalStats": {"global": served_global} if served_global else {},
+        "DailyStats": fetch_collection(endpoint, "dailyStats_collection", DAILY_FIELDS, block)
+    }
+
+def diff_entities(expected, served):
+    """Return (entity, id, field, expected, served) tuples for every mismatch"""
+    diffs = []
+    for entity_type, expected_entities in expected.items():
+        served_entities = served.get(entity_type, {})
+        for entity_id in sorted(set(expected_entities) | set(served_entities)):
+            want = expected_entities.get(entity_id)
+            have = served_entities.get(entity_id)
+            if want is None or have is None:
+                diffs.append((entity_type, entity_id, "*", "present" if want else "missing",
+                              "present" if have else "missing"))
+                continue
+            for field, value in want.items():
+                if str(value) != str(have.get(field)):
+                    diffs.append((entity_type, entity_id, field, str(value), str(have.get(field))))
+    return diffs
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay staking events and verify subgraph entities")
+    parser.add_argument('events', help="Exported event log (.jsonl or .parquet)")
+    parser.add_argument('--endpoint', default=os.getenv('SUBGRAPH_URL'), help="Subgraph GraphQL endpoint to diff against")
+    parser.add_argument('--block', type=int, help="Query the subgraph at this block (match the export's last block)")
+    parser.add_argument('--output', help="Write the replayed entities as JSON")
+    parser.add_argument('--limit', type=int, default=50, help="Maximum diffs printed")
+    args = parser.parse_args()
+
+    started = datetime.now()
+    events = load_events(args.events)
+    loaded = datetime.now()
+    entities = replay(events)
+    finished = datetime.now()
+
+    print(f"📥 Loaded {len(events['event'])} events in {(loaded - started).total_seconds():.2f}s")
+    print(f"⚙️  Replayed {len(entities['User'])} users, {len(entities['DailyStats'])} days "
+          f"in {(finished - loaded).total_seconds():.2f}s")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(entities, f, indent=2, default=str)
+        print(f"✅ Entities written to {args.output}")
+
+    if not args.endpoint:
+        return True
+
+    try:
+        served = fetch_subgraph(args.endpoint, args.block)
+    except Exception as e:
+        print(f"❌ Error querying subgraph: {e}")
+        return False
+
+    diffs = diff_entities(entities, served)
+    if not diffs:
+        print("✅ Subgraph entities match the replayed event log")
+        return True
+
+    print(f"❌ {len(diffs)} differences found")
+    for entity_type, entity_id, field, want, have in diffs[:args.limit]:
+        print(f"  {entity_type}({entity_id}).{field}: expected {want}, subgraph has {have}")
+    if len(diffs) > args.limit:
+        print(f"  … and {len(diffs) - args.limit} more")
+    return False
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Opt-in sampling profiler for the repository tooling scripts
+
+A background thread periodically snapshots the stack of every other thread
+(sys._current_frames), so worker pools and the asyncio event loop thread are
+covered without instrumenting any code. Sampling is wall-clock: time spent
+waiting on TLS reads, retries or locks shows up alongside CPU work. Each run
+writes a collapsed-stack file (flamegraph.pl, speedscope, inferno) and a
+speedscope JSON profile to .cache/tooling/profiles.
+
+Importing this module has no side effects. Run any script under it:
+
+    python3 sampling_profiler.py create_pr.py
+
+or enable it from a script's main() with start() or start_from_env(), which
+reads TOOLING_PROFILE=1 (TOOLING_PROFILE_INTERVAL_MS sets the period), as
+publish_prs.py does.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import runpy
+import sys
+import threading
+import time
+from collections import Counter
+
+from hash_cache import CACHE_DIR
+
+PROFILE_DIR = os.path.join(CACHE_DIR, "profiles")
+DEFAULT_INTERVAL_MS = 10
+
+_active = None
+
+def short_path(filename):
+    """Repository files relative to the working directory, library files by module path"""
+    if not os.path.isabs(filename):
+        return filename
+    relative = os.path.relpath(filename)
+    if not relative.startswith(".."):
+        return relative
+    parts = filename.split(os.sep)
+    for marker in ("site-packages", "dist-packages"):
+        if marker in parts:
+            return "/".join(parts[parts.index(marker) + 1:])
+    return "/".join(parts[-2:])
+
+class SamplingProfiler:
+    """Samples the Python stacks of all other threads at a fixed interval"""
+
+    def __init__(self, name, interval=DEFAULT_INTERVAL_MS / 1000):
+        self.name = name
+        self.interval = interval
+        self.samples = Counter()
+        self.frames = {}
+        self.thread_names = {}
+        self.sample_count = 0
+        self.overhead = 0.0
+        self.started = None
+        self.elapsed = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self.elapsed = time.perf_counter() - self.started
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            began = time.perf_counter()
+            frames = sys._current_frames()
+            if frames.keys() - self.thread_names.keys():
+                self.thread_names.update((t.ident, t.name) for t in threading.enumerate())
+            for thread_id, frame in frames.items():
+                if thread_id != own_id:
+                    self.samples[(thread_id, self._stack(frame))] += 1
+            self.sample_count += 1
+            self.overhead += time.perf_counter() - began
+
+    def _stack(self, frame):
+        """Return the stack as a root-first tuple of frame ids"""
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            frame_id = self.frames.get(code)
+            if frame_id is None:
+                frame_id = self.frames[code] = len(self.frames)
+            stack.append(frame_id)
+            frame = frame.f_back
+        return tuple(reversed(stack))
+
+    def frame_labels(self):
+        labels = [None] * len(self.frames)
+        for code, frame_id in self.frames.items():
+            labels[frame_id] = (code.co_name, short_path(code.co_filename), code.co_firstlineno)
+        return labels
+
+    def write_collapsed(self, path):
+        labels = self.frame_labels()
+        with open(path, 'w') as f:
+            for (thread_id, stack), count in sorted(self.samples.items(), key=lambda item: -item[1]):
+                names = [self.thread_names.get(thread_id, str(thread_id)).replace(";", ":")]
+                names += [f"{name} ({file}:{line})".replace(";", ":") for name, file, line in (labels[i] for i in stack)]
+                f.write(f"{';'.join(names)} {count}\n")
+
+    def write_speedscope(self, path):
+        labels = self.frame_labels()
+        by_thread = {}
+        for (thread_id, stack), count in self.samples.items():
+            by_thread.setdefault(thread_id, []).append((stack, count))
+
+        profiles = []
+        for thread_id, stacks in sorted(by_thread.items()):
+            weights = [count * self.interval for _, count in stacks]
+            profiles.append({
+                "type": "sampled",
+                "name": self.thread_names.get(thread_id, str(thread_id)),
+                "unit": "seconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": [list(stack) for stack, _ in stacks],
+                "weights": weights
+            })
+
+        with open(path, 'w') as f:
+            json.dump({
+                "$schema": "https://www.speedscope.app/file-format-schema.json",
+                "name": self.name,
+                "exporter": "sampling_profiler.py",
+                "shared": {"frames": [{"name": name, "file": file, "line": line} for name, file, line in labels]},
+                "profiles": profiles
+            }, f)
+
+    def write(self, output_dir=PROFILE_DIR):
+        """Write both output formats and return their base path"""
+        os.makedirs(output_dir, exist_ok=True)
+        base = os.path.join(output_dir, f"{self.name}-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}")
+        self.write_collapsed(f"{base}.collapsed")
+        self.write_speedscope(f"{base}.speedscope.json")
+        return base
+
+def start(name, interval_ms=DEFAULT_INTERVAL_MS, output_dir=PROFILE_DIR):
+    """Start profiling this process and write the profile when it exits"""
+    global _active
+    if _active is not None:
+        return _active
+    _active = SamplingProfiler(name, interval_ms / 1000).start()
+
+    def finish():
+        _active.stop()
+        base = _active.write(output_dir)
+        overhead = _active.overhead / _active.elapsed * 100 if _active.elapsed else 0
+        print(f"🔥 {_active.sample_count} samples over {_active.elapsed:.1f}s ({overhead:.1f}% sampler time): "
+              f"{base}.collapsed, {base}.speedscope.json", file=sys.stderr)
+
+    atexit.register(finish)
+    return _active
+
+def start_from_env():
+    """Start profiling when TOOLING_PROFILE is set"""
+    if os.getenv('TOOLING_PROFILE', '') not in ('', '0'):
+        name = os.path.splitext(os.path.basename(sys.argv[0] or 'python'))[0]
+        start(name, float(os.getenv('TOOLING_PROFILE_INTERVAL_MS', DEFAULT_INTERVAL_MS)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Run a tooling script under the sampling profiler")
+    parser.add_argument('--interval-ms', type=float, default=DEFAULT_INTERVAL_MS, help="Sampling period")
+    parser.add_argument('--output-dir', default=PROFILE_DIR, help="Where profiles are written")
+    parser.add_argument('script', help="Script to run")
+    parser.add_argument('args', nargs=argparse.REMAINDER, help="Arguments passed to the script")
+    args = parser.parse_args()
+
+    # Share this module's state with scripts that import sampling_profiler themselves
+    sys.modules.setdefault("sampling_profiler", sys.modules[__name__])
+    sys.argv = [args.script, *args.args]
+    sys.path.insert(0, os.path.dirname(os.path.abspath(args.script)))
+    start(os.path.splitext(os.path.basename(args.script))[0], args.interval_ms, args.output_dir)
+    runpy.run_path(args.script, run_name="__main__")
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
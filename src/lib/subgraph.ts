@@ -1,7 +1,9 @@
 import { ApolloClient, InMemoryCache, gql, HttpLink } from '@apollo/client';
 
 // TODO: Replace with actual subgraph URL
-const SUBGRAPH_URL = 'https://api.thegraph.com/subgraphs/name/your-org/your-subgraph';
+// Set VITE_SUBGRAPH_URL to use another endpoint, e.g. the caching proxy (subgraph_proxy.py)
+const SUBGRAPH_URL =
+  import.meta.env.VITE_SUBGRAPH_URL || 'https://api.thegraph.com/subgraphs/name/your-org/your-subgraph';
 
 export const client = new ApolloClient({
   link: new HttpLink({ uri: SUBGRAPH_URL }),
@@ -0,0 +1,322 @@
+#!/usr/bin/env python3
+"""
+Script to run a local caching GraphQL proxy in front of the subgraph
+
+Queries are normalized (comments, whitespace and commas removed, variables
+canonicalized) into a cache key, and responses are kept in an in-memory LRU
+backed by a disk cache in .cache/tooling/subgraph-proxy. Subgraph data only
+changes when the indexer processes a new block, so entries stay valid until
+the indexed block (_meta.block, polled in the background) advances or its
+hash changes in a reorg.
+
+Point the app at it with VITE_SUBGRAPH_URL=http://127.0.0.1:8788/ (see
+src/lib/subgraph.ts). --offline serves only what is on disk, which lets e2e
+runs replay a recorded session without reaching the indexer.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sys
+from collections import OrderedDict
+
+from hash_cache import CACHE_DIR
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+DISK_CACHE_DIR = os.path.join(CACHE_DIR, "subgraph-proxy")
+META_QUERY = "query ProxyBlock { _meta { block { number hash } } }"
+
+# Block strings, strings, comments, spread, names/variables, numbers, punctuators.
+# Commas are insignificant in GraphQL and are dropped like whitespace.
+TOKEN = re.compile(r'"""(?:\\"""|[^"]|"(?!""))*"""|"(?:\\.|[^"\\])*"|#[^\n]*|\.\.\.|\$?[_A-Za-z][_A-Za-z0-9]*|-?\d[\d.eE+-]*|[!$&():=@\[\]{|}]')
+
+def normalize_query(query):
+    """Canonical single-line form of a GraphQL document"""
+    out = []
+    previous_word = False
+    for token in TOKEN.findall(query):
+        if token.startswith("#"):
+            continue
+        word = token[0] not in '!$&():=@[]{|}.' or token.startswith("$")
+        if word and previous_word:
+            out.append(" ")
+        out.append(token)
+        previous_word = word
+    return "".join(out)
+
+def cache_key(payload):
+    canonical = json.dumps({
+        "operation": payload.get("operationName") or "",
+        "query": normalize_query(payload.get("query") or ""),
+        "variables": payload.get("variables") or {}
+    }, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+class Upstream:
+    """Posts GraphQL payloads to the real subgraph (aiohttp, or urllib in threads)"""
+
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.session = None
+
+    async def open(self):
+        if aiohttp is not None:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=30))
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+    async def post(self, body):
+        """Return (status, response bytes) for a raw request body"""
+        if self.session is not None:
+            async with self.session.post(self.endpoint, data=body,
+                                         headers={"Content-Type": "application/json"}) as response:
+                return response.status, await response.read()
+        return await asyncio.to_thread(self.post_blocking, body)
+
+    def post_blocking(self, body):
+        import urllib.error
+        import urllib.request
+
+        request = urllib.request.Request(self.endpoint, data=body, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read()
+
+class BlockAwareCache:
+    """Memory LRU over a disk cache, with entries tagged by the indexed block"""
+
+    def __init__(self, directory, max_entries):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.memory = OrderedDict()
+        self.block = None
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], f"{key}.json")
+
+    def get(self, key, allow_stale=False):
+        """Return (body, block) for a key, or None when missing or stale"""
+        entry = self.memory.get(key)
+        if entry is None:
+            try:
+                with open(self.path(key)) as f:
+                    data = json.load(f)
+                entry = (data["body"].encode(), tuple(data["block"]))
+            except (OSError, ValueError, KeyError):
+                return None
+            self.remember(key, entry)
+        else:
+            self.memory.move_to_end(key)
+        if not allow_stale and entry[1] != self.block:
+            return None
+        return entry
+
+    def put(self, key, body, block):
+        self.remember(key, (body, block))
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({"block": list(block), "body": body.decode()}, f)
+        os.replace(tmp_path, path)
+
+    def remember(self, key, entry):
+        self.memory[key] = entry
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def advance(self, block):
+        """Record the latest indexed block, dropping in-memory entries from older blocks"""
+        if block == self.block:
+            return False
+        self.block = block
+        self.memory = OrderedDict((k, v) for k, v in self.memory.items() if v[1] == block)
+        return True
+
+class SubgraphProxy:
+    def __init__(self, upstream, cache, poll_interval, offline):
+        self.upstream = upstream
+        self.cache = cache
+        self.poll_interval = poll_interval
+        self.offline = offline
+        self.inflight = {}
+        self.stats = {"hit": 0, "miss": 0, "stale": 0, "bypass": 0, "blocks": 0}
+
+    async def refresh_block(self):
+        status, body = await self.upstream.post(json.dumps({"query": META_QUERY}).encode())
+        block = json.loads(body)["data"]["_meta"]["block"] if status == 200 else None
+        if block and self.cache.advance((int(block["number"]), block.get("hash") or "")):
+            self.stats["blocks"] += 1
+            print(f"🧱 Indexed block {block['number']}")
+
+    async def poll_blocks(self):
+        while True:
+            try:
+                await self.refresh_block()
+            except Exception as e:
+                print(f"⚠️  Failed to read _meta.block: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def resolve(self, body):
+        """Return (status, body, cache state) for a GraphQL request body"""
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            return 400, b'{"errors":[{"message":"Invalid JSON body"}]}', "bypass"
+        if isinstance(payload, list) or normalize_query(payload.get("query") or "").startswith(("mutation", "subscription")):
+            self.stats["bypass"] += 1
+            status, response = await self.upstream.post(body)
+            return status, response, "bypass"
+
+        key = cache_key(payload)
+        if self.offline:
+            entry = self.cache.get(key, allow_stale=True)
+            if entry is None:
+                self.stats["miss"] += 1
+                return 504, b'{"errors":[{"message":"Not in the offline cache"}]}', "miss"
+            self.stats["hit"] += 1
+            return 200, entry[0], "hit"
+
+        entry = self.cache.get(key)
+        if entry is not None:
+            self.stats["hit"] += 1
+            return 200, entry[0], "hit"
+
+        # Concurrent identical misses share one upstream request
+        pending = self.inflight.get(key)
+        if pending is None:
+            pending = self.inflight[key] = asyncio.ensure_future(self.fetch(key, body))
+            pending.add_done_callback(lambda _: self.inflight.pop(key, None))
+        try:
+            status, response = await asyncio.shield(pending)
+        except Exception as e:
+            stale = self.cache.get(key, allow_stale=True)
+            if stale is not None:
+                self.stats["stale"] += 1
+                return 200, stale[0], "stale"
+            return 502, json.dumps({"errors": [{"message": f"Upstream error: {e}"}]}).encode(), "miss"
+        self.stats["miss"] += 1
+        return status, response, "miss"
+
+    async def fetch(self, key, body):
+        block = self.cache.block
+        status, response = await self.upstream.post(body)
+        # Only cache clean responses, and only if no new block arrived mid-request
+        if status == 200 and block is not None and block == self.cache.block and b'"errors"' not in response:
+            self.cache.put(key, response, block)
+        return status, response
+
+    async def handle(self, reader, writer):
+        """Minimal keep-alive HTTP/1.1 handler with CORS for the browser app"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path = (request_line.decode().split() + ["", ""])[:2]
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode().partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+
+                extra = {}
+                if method == "OPTIONS":
+                    status, response = 204, b""
+                elif method == "GET" and path.startswith("/stats"):
+                    status, response = 200, json.dumps(dict(self.stats, block=self.cache.block)).encode()
+                elif method == "POST":
+                    status, response, state = await self.resolve(body)
+                    extra["X-Cache"] = state.upper()
+                    if self.cache.block:
+                        extra["X-Subgraph-Block"] = str(self.cache.block[0])
+                else:
+                    status, response = 405, b'{"errors":[{"message":"Use POST"}]}'
+
+                head = [f"HTTP/1.1 {status} {'OK' if status < 400 else 'Error'}",
+                        "Content-Type: application/json",
+                        f"Content-Length: {len(response)}",
+                        "Access-Control-Allow-Origin: *",
+                        "Access-Control-Allow-Methods: POST, GET, OPTIONS",
+                        "Access-Control-Allow-Headers: content-type, authorization, apollographql-client-name, apollographql-client-version",
+                        "Access-Control-Expose-Headers: X-Cache, X-Subgraph-Block"]
+                head += [f"{name}: {value}" for name, value in extra.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + response)
+                await writer.drain()
+                if headers.get("connection", "").lower() == "close":
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+async def run(args):
+    upstream = Upstream(args.upstream)
+    cache = BlockAwareCache(args.cache_dir, args.max_entries)
+    proxy = SubgraphProxy(upstream, cache, args.poll_interval, args.offline)
+    await upstream.open()
+
+    poller = None
+    if not args.offline:
+        try:
+            await proxy.refresh_block()
+        except Exception as e:
+            print(f"⚠️  Could not reach {args.upstream}: {e}")
+        poller = asyncio.ensure_future(proxy.poll_blocks())
+
+    server = await asyncio.start_server(proxy.handle, args.host, args.port)
+    source = f"{args.cache_dir} (offline)" if args.offline else args.upstream
+    print(f"🗄️  Serving {source} on http://{args.host}:{args.port}/")
+    try:
+        await server.serve_forever()
+    finally:
+        if poller is not None:
+            poller.cancel()
+        server.close()
+        await upstream.close()
+        served = proxy.stats["hit"] + proxy.stats["miss"] + proxy.stats["stale"]
+        print(f"\n📊 {served} queries: {proxy.stats['hit']} hits, {proxy.stats['miss']} misses, "
+              f"{proxy.stats['stale']} stale, {proxy.stats['blocks']} block advances")
+
+def main():
+    parser = argparse.ArgumentParser(description="Caching GraphQL proxy for the subgraph")
+    parser.add_argument('--upstream', default=os.getenv('SUBGRAPH_UPSTREAM_URL'),
+                        help="Subgraph GraphQL endpoint (or SUBGRAPH_UPSTREAM_URL)")
+    parser.add_argument('--host', default="127.0.0.1", help="Interface to bind")
+    parser.add_argument('--port', type=int, default=8788, help="Port to listen on")
+    parser.add_argument('--cache-dir', default=DISK_CACHE_DIR, help="Disk cache directory")
+    parser.add_argument('--max-entries', type=int, default=5000, help="Entries kept in memory")
+    parser.add_argument('--poll-interval', type=float, default=2.0, help="Seconds between _meta.block checks")
+    parser.add_argument('--offline', action='store_true', help="Serve only cached responses, never call upstream")
+    args = parser.parse_args()
+
+    if not args.upstream and not args.offline:
+        print("Please pass --upstream or set SUBGRAPH_UPSTREAM_URL")
+        return False
+    if aiohttp is None and not args.offline:
+        print("⚠️  aiohttp not installed, falling back to threaded urllib (pip install aiohttp)")
+
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)
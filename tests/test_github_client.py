@@ -0,0 +1,48 @@
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from github_client import iter_json_array
+
+def chunked(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+class IterJsonArrayTest(unittest.TestCase):
+    items = [{"id": 1, "name": "lint", "output": {"text": "a [b] \"c\""}},
+             {"id": 2, "name": "check_runs", "unicode": "✅ ünïcode"},
+             {"id": 3, "name": "tests", "nested": [[1, 2], {"x": []}]}]
+
+    def test_top_level_array_across_chunk_boundaries(self):
+        data = json.dumps(self.items).encode()
+        for size in range(1, len(data) + 1):
+            with self.subTest(chunk_size=size):
+                self.assertEqual(list(iter_json_array(chunked(data, size))), self.items)
+
+    def test_keyed_array_across_chunk_boundaries(self):
+        data = json.dumps({"total_count": 3, "check_runs": self.items}).encode()
+        for size in range(1, len(data) + 1):
+            with self.subTest(chunk_size=size):
+                self.assertEqual(list(iter_json_array(chunked(data, size), "check_runs")), self.items)
+
+    def test_whitespace_between_key_and_array(self):
+        data = b'{"total_count": 3, "check_runs" :\n  [ 1 , 2 ,3 ] }'
+        for size in (1, 3, 11, 33):
+            with self.subTest(chunk_size=size):
+                self.assertEqual(list(iter_json_array(chunked(data, size), "check_runs")), [1, 2, 3])
+
+    def test_scalars_split_across_chunks(self):
+        values = [12345, 678, -9.25e3, "text", True, None, 100000000000000000000]
+        data = json.dumps(values).encode()
+        for size in range(1, len(data) + 1):
+            with self.subTest(chunk_size=size):
+                self.assertEqual(list(iter_json_array(chunked(data, size))), values)
+        self.assertEqual(list(iter_json_array([b"[12", b"345, 678]"])), [12345, 678])
+
+    def test_empty_array(self):
+        self.assertEqual(list(iter_json_array([b'{"check_runs": [', b"]}"], "check_runs")), [])
+
+if __name__ == "__main__":
+    unittest.main()
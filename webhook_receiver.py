@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""
+Script to run a local GitHub webhook receiver that replaces polling
+
+Point a repository webhook (content type application/json) at this server
+and subscribe it to pull_request, check_run and workflow_run events. Each
+delivery's X-Hub-Signature-256 is verified, redeliveries are dropped by
+X-GitHub-Delivery id, and accepted events go onto a queue. A single worker
+drains the queue and performs the follow-up actions:
+
+- retarget: when a PR is merged, open PRs stacked on its head branch are
+  retargeted to its base branch
+- report: CI results are kept as a status table in one sticky PR comment,
+  edited in place as checks complete
+- merge: PRs labelled "automerge" are merged once their workflows succeed
+
+Malformed bodies are rejected before their id is recorded, and the id of an
+event whose handling fails is forgotten again, so GitHub's redelivery of it
+is processed.
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import os
+import queue
+import sys
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from github_client import REPO, github_request, iter_pull_requests, update_pr_comment
+
+EVENTS = ("pull_request", "check_run", "workflow_run")
+ACTIONS = ("retarget", "report", "merge")
+AUTOMERGE_LABEL = "automerge"
+REPORT_MARKER = "ci-status-report"
+SEEN_DELIVERIES_FILE = os.path.join(".cache", "tooling", "webhook-deliveries.json")
+MAX_SEEN_DELIVERIES = 5000
+
+def verify_signature(secret, body, signature):
+    """Check the X-Hub-Signature-256 header against the raw request body"""
+    if not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(f"sha256={expected}", signature)
+
+class DeliveryLog:
+    """Bounded, persisted set of delivery ids used to drop redeliveries"""
+
+    def __init__(self, path, limit=MAX_SEEN_DELIVERIES):
+        self.path = path
+        self.limit = limit
+        self.lock = threading.Lock()
+        self.seen = OrderedDict()
+        try:
+            with open(path) as f:
+                self.seen = OrderedDict.fromkeys(json.load(f))
+        except (OSError, ValueError):
+            pass
+
+    def add(self, delivery_id):
+        """Record a delivery id, returning False if it was already seen"""
+        with self.lock:
+            if delivery_id in self.seen:
+                return False
+            self.seen[delivery_id] = None
+            while len(self.seen) > self.limit:
+                self.seen.popitem(last=False)
+            self.save()
+            return True
+
+    def discard(self, delivery_id):
+        """Forget a delivery id so a redelivery of it is accepted"""
+        with self.lock:
+            if delivery_id in self.seen:
+                del self.seen[delivery_id]
+                self.save()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'w') as f:
+            json.dump(list(self.seen), f)
+
+class EventProcessor:
+    """Drains queued webhook events and performs the enabled follow-up actions"""
+
+    def __init__(self, actions, dry_run, deliveries=None):
+        self.actions = actions
+        self.dry_run = dry_run
+        self.deliveries = deliveries
+        self.events = queue.Queue()
+        self.ci_status = {}
+
+    def run(self):
+        while True:
+            name, payload, delivery = self.events.get()
+            try:
+                getattr(self, f"on_{name}")(payload)
+            except Exception as e:
+                print(f"❌ Error handling {name} event: {e}")
+                if self.deliveries is not None:
+                    self.deliveries.discard(delivery)
+            finally:
+                self.events.task_done()
+
+    def api(self, method, path, **kwargs):
+        if self.dry_run and method != "GET":
+            print(f"📝 [dry-run] {method} {path} {json.dumps(kwargs.get('json', {}))}")
+            return None
+        return github_request(method, path, **kwargs)
+
+    def on_pull_request(self, payload):
+        pr = payload["pull_request"]
+        print(f"🔔 pull_request {payload['action']} #{pr['number']}")
+        if payload["action"] == "closed" and pr.get("merged") and "retarget" in self.actions:
+            self.retarget_stacked(pr)
+        if payload["action"] == "closed":
+            self.ci_status.pop(pr["number"], None)
+
+    def retarget_stacked(self, merged_pr):
+        """Move PRs based on the merged branch onto the merged PR's base"""
+        old_base = merged_pr["head"]["ref"]
+        new_base = merged_pr["base"]["ref"]
+        for pr in iter_pull_requests(state="open", base=old_base):
+            print(f"🔀 Retargeting #{pr['number']} from {old_base} to {new_base}")
+            self.api("PATCH", f"/repos/{REPO}/pulls/{pr['number']}", json={"base": new_base})
+
+    def on_check_run(self, payload):
+        run = payload["check_run"]
+        if payload["action"] != "completed":
+            return
+        print(f"🔔 check_run {run['name']}: {run['conclusion']}")
+        for pr in run.get("pull_requests", []):
+            self.record_status(pr["number"], run["name"], run["conclusion"], run.get("html_url"))
+
+    def on_workflow_run(self, payload):
+        run = payload["workflow_run"]
+        if payload["action"] != "completed":
+            return
+        print(f"🔔 workflow_run {run['name']}: {run['conclusion']}")
+        for pr in run.get("pull_requests", []):
+            self.record_status(pr["number"], run["name"], run["conclusion"], run.get("html_url"))
+            if run["conclusion"] == "success" and "merge" in self.actions:
+                self.merge_if_ready(pr["number"], run["head_sha"])
+
+    def record_status(self, pr_number, name, conclusion, url):
+        statuses = self.ci_status.setdefault(pr_number, {})
+        statuses[name] = (conclusion, url)
+        if "report" not in self.actions:
+            return
+
+        icons = {"success": "✅", "failure": "❌", "cancelled": "⚪", "skipped": "⏭️", "timed_out": "⏱️"}
+        lines = ["## 🤖 CI Status", "", "| Check | Result |", "|-------|--------|"]
+        for check, (result, link) in sorted(statuses.items()):
+            label = f"[{check}]({link})" if link else check
+            lines.append(f"| {label} | {icons.get(result, '❔')} {result} |")
+        if self.dry_run:
+            print(f"📝 [dry-run] update PR #{pr_number} CI status ({len(statuses)} checks)")
+        else:
+            update_pr_comment(pr_number, REPORT_MARKER, "\n".join(lines))
+
+    def merge_if_ready(self, pr_number, head_sha):
+        """Merge an automerge-labelled PR when GitHub reports it as cleanly mergeable"""
+        response = github_request("GET", f"/repos/{REPO}/pulls/{pr_number}")
+        if response.status_code != 200:
+            return
+        pr = response.json()
+        labels = {label["name"] for label in pr.get("labels", [])}
+        if AUTOMERGE_LABEL not in labels or pr["head"]["sha"] != head_sha:
+            return
+        if pr.get("mergeable_state") != "clean":
+            print(f"⏳ #{pr_number} not mergeable yet ({pr.get('mergeable_state')})")
+            return
+        print(f"🚀 Merging #{pr_number}")
+        response = self.api("PUT", f"/repos/{REPO}/pulls/{pr_number}/merge", json={"sha": head_sha})
+        if response is not None and response.status_code != 200:
+            print(f"❌ Failed to merge #{pr_number}: {response.status_code} {response.text}")
+
+def make_handler(secret, deliveries, processor):
+    class WebhookHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+            if not verify_signature(secret, body, self.headers.get("X-Hub-Signature-256")):
+                self.respond(401, "invalid signature")
+                return
+
+            event = self.headers.get("X-GitHub-Event")
+            delivery = self.headers.get("X-GitHub-Delivery", "")
+            if event == "ping":
+                self.respond(200, "pong")
+                return
+            if event not in EVENTS:
+                self.respond(202, "ignored")
+                return
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                self.respond(400, "invalid JSON body")
+                return
+            # Checking and recording the id in one step keeps concurrent redeliveries out
+            if not deliveries.add(delivery):
+                self.respond(200, "duplicate")
+                return
+
+            processor.events.put((event, payload, delivery))
+            self.respond(202, "queued")
+
+        def respond(self, status, message):
+            encoded = message.encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "text/plain")
+            self.send_header("Content-Length", str(len(encoded)))
+            self.end_headers()
+            self.wfile.write(encoded)
+
+        def log_message(self, format, *args):
+            pass
+
+    return WebhookHandler
+
+def main():
+    parser = argparse.ArgumentParser(description="Receive GitHub webhooks and act on PR and CI events")
+    parser.add_argument('--host', default="127.0.0.1", help="Interface to bind")
+    parser.add_argument('--port', type=int, default=8787, help="Port to listen on")
+    parser.add_argument('--secret', default=os.getenv('GITHUB_WEBHOOK_SECRET'), help="Webhook secret")
+    parser.add_argument('--actions', default=",".join(ACTIONS), help="Enabled actions: retarget,report,merge")
+    parser.add_argument('--dry-run', action='store_true', help="Log write actions instead of calling the API")
+    args = parser.parse_args()
+
+    if not args.secret:
+        print("Please set the webhook secret as GITHUB_WEBHOOK_SECRET environment variable")
+        return False
+
+    actions = {a.strip() for a in args.actions.split(",") if a.strip()}
+    unknown = actions - set(ACTIONS)
+    if unknown:
+        print(f"❌ Unknown actions: {', '.join(sorted(unknown))}")
+        return False
+
+    deliveries = DeliveryLog(SEEN_DELIVERIES_FILE)
+    processor = EventProcessor(actions, args.dry_run, deliveries)
+    threading.Thread(target=processor.run, daemon=True).start()
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(args.secret, deliveries, processor))
+    print(f"👂 Listening for {', '.join(EVENTS)} on http://{args.host}:{args.port} (actions: {', '.join(sorted(actions))})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Shutting down")
+    finally:
+        server.server_close()
+    return True
+
+if __name__ == "__main__":
+    success = main()
+    sys.exit(0 if success else 1)